@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""Measure records/sec for decoding and writing one 1000-result search page.
+
+Compares fully validated models, lazy records (validated only when a field
+is read) and the raw decoded dicts that ``raw=True`` harvests write. No
+requests are made; the page is synthetic. Run it from the repository root
+with ``python examples/benchmark_models.py``.
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from loc_downloader import LocAPI
+from loc_downloader.sinks import encode_jsonl
+
+
+def make_page(size=1000):
+    results = []
+    for i in range(size):
+        results.append({
+            "id": f"http://www.loc.gov/item/{2021660000 + i}/",
+            "title": f"Map of the seat of war in Virginia, sheet {i}",
+            "date": f"{1861 + i % 5}-01-01",
+            "digitized": True,
+            "original_format": ["map"],
+            "online_format": ["image"],
+            "partof": ["civil war maps", "geography and map division"],
+            "subject": ["virginia", "maps", "united states--history--civil war, 1861-1865"],
+            "contributor": ["hotchkiss, jedediah"],
+            "image_url": [f"https://tile.loc.gov/image-services/iiif/service:gmd:{i}/full/pct:25/0/default.jpg"],
+            "location": ["virginia", "united states"],
+            "language": ["english"],
+            "number_lccn": [f"{2021660000 + i}"],
+            "timestamp": "2022-06-15T14:32:07.123Z",
+        })
+    pagination = {"from": 1, "to": size, "total": size, "current": 1, "perpage": size, "next": None}
+    return {"results": results, "pagination": pagination}
+
+
+def benchmark(api, body, rounds=20, raw=False):
+    started = time.perf_counter()
+    for _ in range(rounds):
+        data = api.codec.loads(body)
+        results = data.get("results", []) if raw else api._parse_results(data)
+        b"".join(encode_jsonl(result, api.codec) for result in results)
+    elapsed = time.perf_counter() - started
+    return rounds * len(results) / elapsed
+
+
+def main():
+    api = LocAPI()
+    body = api.codec.dumps(make_page())
+    print(f"JSON backend: {api.codec.backend}")
+
+    api.lazy_models = False
+    print(f"validated models: {benchmark(api, body):>10,.0f} records/sec")
+
+    api.lazy_models = True
+    print(f"lazy records:     {benchmark(api, body):>10,.0f} records/sec")
+
+    print(f"raw dicts:        {benchmark(api, body, raw=True):>10,.0f} records/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 from .api import LocAPI
+from .async_api import AsyncLocAPI
 from .models import Item, Collection, Resource
 from .url_handler import LocURLHandler
 
 __version__ = "0.1.0"
-__all__ = ["LocAPI", "Item", "Collection", "Resource", "LocURLHandler"]
\ No newline at end of file
+__all__ = ["LocAPI", "AsyncLocAPI", "Item", "Collection", "Resource", "LocURLHandler"]
\ No newline at end of file
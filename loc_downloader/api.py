@@ -1,12 +1,19 @@
 import logging
+import os
 import re
 import time
+from datetime import datetime, timezone
 import mimetypes
-from typing import List, Optional, Dict, Any, Tuple, Generator, Union
+from typing import List, Optional, Dict, Any, Tuple, Generator, Union, Callable, Iterable, Iterator
 from urllib.parse import urlparse, parse_qs
 import json
+import hashlib
+import itertools
+import queue
+from contextlib import closing
+import threading
 from pathlib import Path
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
 
 import requests
 from requests_ratelimiter import LimiterSession
@@ -14,14 +21,26 @@ from pyrate_limiter import Duration, RequestRate, Limiter
 from tqdm import tqdm
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type, before_sleep_log
 
-from .models import Item, ItemResponse, SearchResponse, SearchResult, Collection
+from .cache import ResponseCache
+from .codec import JSONCodec
+from .checkpoint import HarvestCheckpoint
+from .dedup import SeenIds
+from .manifest import DownloadManifest
+from .planner import FacetPartitionPlanner, Partition
+from .index import MetadataIndex, item_id_from
+from .journal import BatchJournal
+from .store import ResultStore
+from .sinks import COMPRESSIONS, compressor, encode_jsonl, open_sink, resume_dir_for, sink_class
+from .rate_control import AdaptiveRateController, parse_retry_after
+from .models import Item, ItemResponse, SearchResponse, SearchResult, Collection, FileInfo, Resource, LazyRecord
 from .exceptions import LocAPIError, RateLimitError
 from .url_handler import LocURLHandler
 
 
 logger = logging.getLogger(__name__)
 
-
+# Marks the end of a stream between pipeline stages
+_DONE = object()
 
 
 class LocAPI:
@@ -44,15 +63,37 @@ class LocAPI:
             "per_second": 2,  # 20 per 10 seconds
             "per_minute": 80,
             "burst": 10
+        },
+        "newspapers": {
+            "per_second": 1,  # 10 per 10 seconds; the 20 per minute burst limit binds first
+            "per_minute": 20,
+            "burst": 10
+        },
+        "files": {
+            "per_second": 5,  # Static file hosts have no documented limit
+            "per_minute": 300,
+            "burst": 10
         }
     }
     
-    def __init__(self, max_workers: int = 10):
+    THROTTLE_STATUSES = (429, 503)  # Responses that mean the server wants us to slow down
+    
+    DOWNLOAD_CHUNK_SIZE = 1024 * 1024  # Bytes read per chunk when streaming files
+    
+    def __init__(self, max_workers: int = 10, cache_path: Optional[str] = None,
+                 cache_ttl: float = 86400, cache_max_bytes: int = 1024 * 1024 * 1024,
+                 max_buffer_bytes: int = 64 * 1024 * 1024,
+                 rate_limits: Optional[Dict[str, Dict[str, float]]] = None,
+                 max_in_flight: Optional[int] = None, json_backend: Optional[str] = None,
+                 lazy_models: bool = False):
         self.url_handler = LocURLHandler()
+        self.codec = JSONCodec(json_backend)
+        self.rate_limits = {**self.RATE_LIMITS, **(rate_limits or {})}
         self.sessions = {}
+        self.rate_controllers = {}
         
         # Create rate-limited sessions for each endpoint type
-        for endpoint, limits in self.RATE_LIMITS.items():
+        for endpoint, limits in self.rate_limits.items():
             session = LimiterSession(
                 per_second=limits["per_second"],
                 per_minute=limits["per_minute"],
@@ -63,6 +104,12 @@ class LocAPI:
             })
             self.sessions[endpoint] = session
             
+            # The sessions enforce the hard limits; the controller paces below
+            # them and backs off for everyone when the server pushes back
+            self.rate_controllers[endpoint] = AdaptiveRateController(
+                max_rate=min(limits["per_second"], limits["per_minute"] / 60)
+            )
+            
         # Default session for unknown endpoints
         self.default_session = requests.Session()
         self.default_session.headers.update({
@@ -71,57 +118,116 @@ class LocAPI:
             
         self.max_workers = max_workers
         
+        # Pages fetched ahead of the consumer, bounding memory when writing is slow
+        self.max_in_flight = max_in_flight or max_workers * 2
+        
+        # Caps the download bytes held in memory across all workers at once
+        self._buffer_slots = threading.BoundedSemaphore(max(1, max_buffer_bytes // self.DOWNLOAD_CHUNK_SIZE))
+        
+        # Defer validating search results until a field is read
+        self.lazy_models = lazy_models
+        
+        # Optional persistent cache for API (not file) responses
+        self.cache = ResponseCache(cache_path, ttl=cache_ttl, max_bytes=cache_max_bytes) if cache_path else None
+        
+    def close(self):
+        """Close the HTTP sessions and the response cache."""
+        for session in self.sessions.values():
+            session.close()
+        self.default_session.close()
+        if self.cache:
+            self.cache.close()
+    
     def _get_endpoint_type(self, url: str) -> str:
-        if self.url_handler.is_item_url(url):
-            return "item"
-        elif self.url_handler.is_resource_url(url):
-            return "resource"
-        elif self.url_handler.is_collection_url(url):
-            return "collections"
-        return "item"  # default
+        return self.url_handler.get_endpoint_type(url)
+    
+    def _check_throttle(self, response: requests.Response, controller: AdaptiveRateController):
+        """Report a throttling response to the shared controller and raise for a retry."""
+        if response.status_code in self.THROTTLE_STATUSES:
+            controller.on_throttle(parse_retry_after(response.headers.get("Retry-After")))
+            raise RateLimitError(f"Throttled with HTTP {response.status_code} for {response.url}")
             
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=2, max=60),
-        retry=retry_if_exception_type(requests.exceptions.RequestException),
+        retry=retry_if_exception_type((requests.exceptions.RequestException, RateLimitError)),
         before_sleep=before_sleep_log(logger, logging.WARNING)
     )
     def _make_request(self, url: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         endpoint_type = self._get_endpoint_type(url)
         session = self.sessions.get(endpoint_type, self.default_session)
+        controller = self.rate_controllers[endpoint_type]
         
         if params is None:
             params = {}
         
         params.setdefault("fo", "json")
         
-        response = session.get(url, params=params, timeout=30)
-        
-        if response.status_code == 429:
-            logger.warning(f"Rate limit hit for {url}, waiting...")
-            time.sleep(300)
-            raise requests.exceptions.RequestException("Rate limit hit")
+        headers = {}
+        cached = None
+        if self.cache:
+            cache_key = self.cache.make_key(url, params)
+            cached = self.cache.get(cache_key)
+            if cached:
+                if self.cache.is_fresh(cached):
+                    return self.codec.loads(cached.body)
+                headers = self.cache.conditional_headers(cached)
+        
+        controller.wait()
+        started = time.monotonic()
+        response = session.get(url, params=params, headers=headers, timeout=30)
+        
+        self._check_throttle(response, controller)
+        controller.on_success(time.monotonic() - started)
+        
+        if response.status_code == 304 and cached:
+            self.cache.refresh(cache_key)
+            return self.codec.loads(cached.body)
             
         response.raise_for_status()
-        return response.json()
+        
+        if self.cache:
+            self.cache.set(cache_key, response.content,
+                           etag=response.headers.get("ETag"),
+                           last_modified=response.headers.get("Last-Modified"))
+        return self.codec.loads(response.content)
                 
+    def _parse_results(self, data: Dict[str, Any]) -> List[SearchResult]:
+        """Turn a search page into results, as ``LazyRecord``s when ``lazy_models`` is set."""
+        if self.lazy_models:
+            return [LazyRecord(SearchResult, result) for result in data.get("results", [])]
+        return SearchResponse(**data).results
+    
+    @staticmethod
+    def _result_id(result: Union[SearchResult, LazyRecord, Dict[str, Any]]) -> str:
+        # Read the id without validating lazy or raw results
+        return result.id if isinstance(result, SearchResult) else result["id"]
+    
     def parse_url(self, url: str) -> Tuple[str, str]:
         return self.url_handler.parse_url(url)
         
-    def get_item(self, item_id: str) -> ItemResponse:
+    def get_item(self, item_id: str, attributes: Optional[str] = None) -> ItemResponse:
+        """Fetch an item, optionally limited to some attributes (e.g. ``"item,resources"``)."""
         url = self.url_handler.get_item_url(item_id)
-        data = self._make_request(url)
+        data = self._make_request(url, params={"at": attributes} if attributes else None)
         return ItemResponse(**data)
+    
+    def get_item_resources(self, item_id: str) -> List[Resource]:
+        """Fetch only the resources of an item."""
+        url = self.url_handler.get_item_url(item_id)
+        data = self._make_request(url, params={"at": "resources"})
+        return [Resource(**resource) for resource in data.get("resources", [])]
         
     def get_collection_items(self, collection_name: str, 
-                           limit: Optional[int] = None) -> List[SearchResult]:
+                           limit: Optional[int] = None) -> ResultStore:
+        """Fetch the items of a collection into a disk-backed, list-like ``ResultStore``."""
         url = self.url_handler.get_collection_url(collection_name)
         
-        all_results = []
+        all_results = self._new_result_store()
         page = 1
         per_page = self.PAGE_SIZE
         
-        initial_data = self._make_request(url, params={"c": per_page, "sp": page})
+        initial_data = self._make_request(url, params={"c": 1, "at": "pagination"})
         total_results = initial_data["pagination"]["total"]
         
         if total_results > self.DEEP_PAGING_LIMIT:
@@ -133,20 +239,21 @@ class LocAPI:
                 params = {
                     "c": per_page,
                     "sp": page,
+                    "at": "results,pagination",
                     "fa": "digitized:true"
                 }
                 
                 data = self._make_request(url, params=params)
-                response = SearchResponse(**data)
+                results = self._parse_results(data)
                 
-                for result in response.results:
+                for result in results:
                     if limit and len(all_results) >= limit:
                         return all_results
                         
                     all_results.append(result)
                     pbar.update(1)
                     
-                if response.pagination.next is None:
+                if data["pagination"].get("next") is None:
                     break
                     
                 page += 1
@@ -154,16 +261,19 @@ class LocAPI:
         return all_results
         
     def _get_collection_with_faceting(self, collection_name: str,
-                                    limit: Optional[int] = None) -> List[SearchResult]:
+                                    limit: Optional[int] = None) -> ResultStore:
         url = self.url_handler.get_collection_url(collection_name)
         
-        date_ranges = self._find_optimal_date_ranges(url)
+        partitions = self._plan_partitions(url)
         
-        all_results = []
+        # Facets overlap, so the same item can appear in several partitions
+        seen = SeenIds(capacity=max(sum(p.count for p in partitions), 1000))
+        
+        all_results = self._new_result_store()
         total_processed = 0
         
-        with tqdm(total=limit, desc="Fetching items with date faceting") as pbar:
-            for start_year, end_year in date_ranges:
+        with tqdm(total=limit, desc="Fetching items with date faceting") as pbar, closing(seen):
+            for partition in partitions:
                 if limit and total_processed >= limit:
                     break
                     
@@ -172,100 +282,87 @@ class LocAPI:
                 
                 while True:
                     params = {
+                        **partition.params,
                         "c": per_page,
                         "sp": page,
-                        "fa": "digitized:true",
-                        "dates": f"{start_year}/{end_year}"
+                        "at": "results,pagination"
                     }
                     
                     data = self._make_request(url, params=params)
-                    response = SearchResponse(**data)
+                    results = self._parse_results(data)
                     
-                    for result in response.results:
+                    for result in results:
                         if limit and len(all_results) >= limit:
                             return all_results
+                        if not seen.add(self._result_id(result)):
+                            continue
                             
                         all_results.append(result)
                         pbar.update(1)
                         
-                    if response.pagination.next is None:
+                    if data["pagination"].get("next") is None:
                         break
                         
                     page += 1
                     
         return all_results
         
-    def _find_optimal_date_ranges(self, base_url: str) -> List[Tuple[int, int]]:
-        data = self._make_request(base_url, params={"fa": "digitized:true"})
-        
-        date_facets = None
-        for facet in data.get("facets", []):
-            if facet.get("name") == "dates":
-                date_facets = facet.get("buckets", [])
-                break
-                
-        if not date_facets:
-            raise LocAPIError("No date facets found")
-            
-        ranges = []
-        for bucket in date_facets:
-            count = bucket.get("count", 0)
-            value = bucket.get("value", "")
+    def _new_result_store(self) -> ResultStore:
+        return ResultStore(codec=self.codec, lazy=self.lazy_models)
+    
+    def _plan_partitions(self, url: str, resume_dir: Optional[Path] = None) -> List[Partition]:
+        """Split a large result set into facet partitions, reusing the plan kept in ``resume_dir``."""
+        planner = FacetPartitionPlanner(self, url, max_count=self.DEEP_PAGING_LIMIT)
+        if not resume_dir:
+            return planner.plan()
+        
+        with closing(HarvestCheckpoint(resume_dir)) as checkpoint:
+            plan = checkpoint.get_plan()
+            if plan is not None:
+                logger.info(f"Loaded facet plan with {len(plan)} partitions from {checkpoint.path}")
+                return [Partition(**p) for p in plan]
             
-            if count < self.DEEP_PAGING_LIMIT and value:
-                year_match = re.match(r"(\d{4})/(\d{4})", value)
-                if year_match:
-                    start_year = int(year_match.group(1))
-                    end_year = int(year_match.group(2))
-                    ranges.append((start_year, end_year))
-            elif count >= self.DEEP_PAGING_LIMIT and value:
-                year_match = re.match(r"(\d{4})/(\d{4})", value)
-                if year_match:
-                    start_year = int(year_match.group(1))
-                    end_year = int(year_match.group(2))
-                    
-                    mid_year = (start_year + end_year) // 2
-                    ranges.extend([
-                        (start_year, mid_year),
-                        (mid_year + 1, end_year)
-                    ])
-                    
-        return sorted(ranges)
+            partitions = planner.plan()
+            checkpoint.set_plan([p.model_dump() for p in partitions])
+            return partitions
     
-    def _check_existing_pages(self, resume_dir: Optional[Path], total_pages: int, year_range: Optional[str] = None) -> List[int]:
-        """Check which pages need to be downloaded based on existing files."""
-        if not resume_dir or not resume_dir.exists():
-            return list(range(1, total_pages + 1))
-        
-        existing_pages = set()
-        for page_file in resume_dir.glob("*.jsonl"):
-            try:
-                # Handle both simple page numbers and faceted page names
-                filename = page_file.stem
-                if "_" in filename and year_range:
-                    # Faceted page: year_range_0001
-                    # Only consider files that match the current year_range
-                    if filename.startswith(f"{year_range}_"):
-                        page_num = int(filename.split("_")[-1])
-                        existing_pages.add(page_num)
-                elif "_" not in filename and not year_range:
-                    # Simple page number (non-faceted)
-                    page_num = int(filename)
-                    existing_pages.add(page_num)
-            except ValueError:
-                continue
-        
-        pages_to_fetch = [p for p in range(1, total_pages + 1) if p not in existing_pages]
+    def _load_checkpoint(self, resume_dir: Optional[Path]) -> Optional[Dict[str, Any]]:
+        """Return the last page recorded by ``save_metadata_resumable``, if any."""
+        if not resume_dir or not (resume_dir / HarvestCheckpoint.FILENAME).exists():
+            return None
+        with closing(HarvestCheckpoint(resume_dir)) as checkpoint:
+            return checkpoint.last()
+    
+    def _resume_tasks(self, tasks: List[Tuple[Union[int, str], Dict[str, Any]]], resume_dir: Optional[Path],
+                      limit: Optional[int] = None) -> Tuple[List[Tuple[Union[int, str], Dict[str, Any]]], int]:
+        """Drop the tasks up to the checkpointed page, returning the rest and the items already written."""
+        checkpoint = self._load_checkpoint(resume_dir)
+        if not checkpoint:
+            return tasks, 0
+        
+        items = checkpoint["items"]
+        if limit and items >= limit:
+            logger.info("All pages already downloaded")
+            return [], items
         
-        if existing_pages:
-            logger.info(f"Found {len(existing_pages)} existing pages, need to fetch {len(pages_to_fetch)} more")
+        page_ids = [page_id for page_id, _ in tasks]
+        if checkpoint["page"] not in page_ids:
+            raise LocAPIError(f"Checkpoint page {checkpoint['page']} is not part of this collection's pages; "
+                              f"remove {resume_dir} to start over")
         
-        return pages_to_fetch
+        remaining = tasks[page_ids.index(checkpoint["page"]) + 1:]
+        logger.info(f"Resuming after page {checkpoint['page']} with {items} items written, "
+                    f"{len(remaining)} pages left")
+        return remaining, items
     
     def _parse_date_facets(self, base_url: str) -> List[Dict[str, Any]]:
         """Parse date facets from the API response."""
-        data = self._make_request(base_url, params={"fa": "digitized:true", "fo": "json"})
-        
+        data = self._make_request(base_url, params={"fa": "digitized:true", "fo": "json", "at": "facets"})
+        return self._date_facets_from_response(data)
+    
+    @staticmethod
+    def _date_facets_from_response(data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Extract non-empty date facet filters from a search response."""
         date_facets = []
         for facet in data.get("facets", []):
             if facet.get("type") == "dates":
@@ -297,7 +394,7 @@ class LocAPI:
         per_page = self.PAGE_SIZE
         items_yielded = 0
         
-        initial_data = self._make_request(url, params={"c": per_page, "sp": page})
+        initial_data = self._make_request(url, params={"c": 1, "at": "pagination"})
         total_results = initial_data["pagination"]["total"]
         
         if total_results > self.DEEP_PAGING_LIMIT:
@@ -309,38 +406,45 @@ class LocAPI:
             params = {
                 "c": per_page,
                 "sp": page,
+                "at": "results,pagination",
                 "fa": "digitized:true"
             }
             
             data = self._make_request(url, params=params)
-            response = SearchResponse(**data)
+            results = self._parse_results(data)
             
-            for result in response.results:
+            for result in results:
                 if limit and items_yielded >= limit:
                     return
                     
                 yield result
                 items_yielded += 1
                 
-            if response.pagination.next is None:
+            if data["pagination"].get("next") is None:
                 break
                 
             page += 1
     
     def iter_collection_pages(self, collection_name: str, 
                             limit: Optional[int] = None,
-                            resume_dir: Optional[Path] = None) -> Generator[Tuple[int, List[SearchResult]], None, None]:
-        """Generator that yields (page_number, results) tuples for collection pages."""
+                            resume_dir: Optional[Path] = None,
+                            ordered: bool = True,
+                            raw: bool = False) -> Generator[Tuple[Union[int, str], List[SearchResult]], None, None]:
+        """Generator that yields (page_id, results) tuples for collection pages.
+        
+        Pages come in a fixed order unless ``ordered`` is False. ``resume_dir`` skips the
+        pages before the checkpoint and ``raw`` yields decoded dicts instead of models.
+        """
         url = self.url_handler.get_collection_url(collection_name)
         per_page = self.PAGE_SIZE
         
         # Get total results
-        initial_data = self._make_request(url, params={"c": 1})
+        initial_data = self._make_request(url, params={"c": 1, "at": "pagination"})
         total_results = initial_data["pagination"]["total"]
         
         if total_results > self.DEEP_PAGING_LIMIT:
             logger.info(f"Collection has {total_results} items, using date faceting")
-            yield from self._iter_collection_pages_with_faceting(collection_name, limit, resume_dir)
+            yield from self._iter_collection_pages_with_faceting(collection_name, limit, resume_dir, ordered, raw)
             return
         
         # Calculate total pages
@@ -349,115 +453,105 @@ class LocAPI:
             max_pages = (limit + per_page - 1) // per_page
             total_pages = min(total_pages, max_pages)
         
-        # Check existing pages
-        pages_to_fetch = self._check_existing_pages(resume_dir, total_pages)
+        tasks = [
+            (page_num, {"c": per_page, "sp": page_num, "at": "results,pagination", "fa": "digitized:true"})
+            for page_num in range(1, total_pages + 1)
+        ]
+        tasks, items_yielded = self._resume_tasks(tasks, resume_dir, limit)
         
-        if not pages_to_fetch:
+        if not tasks:
             logger.info("All pages already downloaded")
             return
         
-        logger.info(f"Downloading {len(pages_to_fetch)} pages")
+        logger.info(f"Downloading {len(tasks)} pages")
         
-        # Download missing pages in parallel
-        yield from self._fetch_pages_parallel(url, pages_to_fetch, per_page, limit)
+        yield from self._fetch_tasks_parallel(url, tasks, limit, items_yielded, ordered=ordered, raw=raw)
     
-    def _fetch_pages_parallel(self, url: str, pages_to_fetch: List[int], 
-                             per_page: int, limit: Optional[int] = None) -> Generator[Tuple[int, List[SearchResult]], None, None]:
-        """Fetch multiple pages in parallel using ThreadPoolExecutor."""
-        def fetch_page(page_num: int) -> Tuple[int, List[SearchResult]]:
-            params = {
-                "c": per_page,
-                "sp": page_num,
-                "fa": "digitized:true"
-            }
+    def _fetch_tasks_parallel(self, url: str, tasks: Iterable[Tuple[Union[int, str], Dict[str, Any]]],
+                              limit: Optional[int] = None, items_yielded: int = 0,
+                              result_filter: Optional[Callable[[Union[int, str], SearchResult], bool]] = None,
+                              ordered: bool = False, raw: bool = False
+                              ) -> Generator[Tuple[Union[int, str], List[SearchResult]], None, None]:
+        """Fetch (page_id, params) tasks in parallel with at most ``max_in_flight`` pages outstanding.
+        
+        ``result_filter`` is applied before ``limit`` is counted. With ``ordered`` pages are
+        yielded in task order and a page that fails after retries raises ``LocAPIError``.
+        """
+        def fetch_page(page_id: Union[int, str], params: Dict[str, Any]) -> Tuple[Union[int, str], List[SearchResult]]:
+            data = self._make_request(url, params=dict(params))
+            if raw:
+                return (page_id, data.get("results", []))
+            return (page_id, self._parse_results(data))
+        
+        task_iter = iter(tasks)
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        future_to_page = {}
+        
+        def submit_next() -> bool:
+            for page_id, params in task_iter:
+                future_to_page[executor.submit(fetch_page, page_id, params)] = page_id
+                return True
+            return False
+        
+        try:
+            while len(future_to_page) < self.max_in_flight and submit_next():
+                pass
             
-            data = self._make_request(url, params=params)
-            response = SearchResponse(**data)
-            return (page_num, response.results)
-        
-        items_yielded = 0
-        
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            # Submit all page requests
-            future_to_page = {executor.submit(fetch_page, page): page for page in pages_to_fetch}
-            
-            # Process completed requests as they finish
-            for future in as_completed(future_to_page):
-                try:
-                    page_num, page_results = future.result()
+            while future_to_page:
+                if ordered:
+                    # Futures are kept in submission order, so the first one is the oldest page
+                    done = [next(iter(future_to_page))]
+                else:
+                    done, _ = wait(future_to_page, return_when=FIRST_COMPLETED)
+                for future in done:
+                    page_id = future_to_page.pop(future)
+                    try:
+                        _, page_results = future.result()
+                    except Exception as e:
+                        if ordered:
+                            raise LocAPIError(f"Failed to fetch page {page_id}: {e}") from e
+                        logger.error(f"Failed to fetch page {page_id}: {e}")
+                        submit_next()
+                        continue
+                    
+                    if result_filter:
+                        page_results = [result for result in page_results if result_filter(page_id, result)]
                     
                     # Apply limit if specified
-                    if limit:
-                        remaining_items = limit - items_yielded
-                        if remaining_items <= 0:
-                            break
-                        if len(page_results) > remaining_items:
-                            page_results = page_results[:remaining_items]
+                    if limit and len(page_results) > limit - items_yielded:
+                        page_results = page_results[:limit - items_yielded]
                     
                     items_yielded += len(page_results)
                     
-                    if page_results:
-                        yield (page_num, page_results)
-                        
-                except Exception as e:
-                    page_num = future_to_page[future]
-                    logger.error(f"Failed to fetch page {page_num}: {e}")
-    
-    def _fetch_facet_pages_parallel(self, facet_url: str, pages_to_fetch: List[int], 
-                                   per_page: int, year_range: str, 
-                                   limit: Optional[int] = None, 
-                                   items_yielded: int = 0) -> Generator[Tuple[str, List[SearchResult]], None, None]:
-        """Fetch multiple faceted pages in parallel using ThreadPoolExecutor."""
-        def fetch_page(page_num: int) -> Tuple[int, List[SearchResult]]:
-            params = {
-                "c": per_page,
-                "sp": page_num,
-                "fo": "json"
-            }
-            
-            data = self._make_request(facet_url, params=params)
-            response = SearchResponse(**data)
-            return (page_num, response.results)
-        
-        local_items_yielded = 0
-        
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            # Submit all page requests
-            future_to_page = {executor.submit(fetch_page, page): page for page in pages_to_fetch}
-            
-            # Process completed requests as they finish
-            for future in as_completed(future_to_page):
-                try:
-                    page_num, page_results = future.result()
-                    
-                    # Apply limit if specified
-                    if limit:
-                        remaining_items = limit - items_yielded - local_items_yielded
-                        if remaining_items <= 0:
-                            break
-                        if len(page_results) > remaining_items:
-                            page_results = page_results[:remaining_items]
+                    # Filtered pages are yielded even when empty so they count as done
+                    if page_results or result_filter:
+                        yield (page_id, page_results)
                     
-                    local_items_yielded += len(page_results)
+                    if limit and items_yielded >= limit:
+                        return
                     
-                    if page_results:
-                        # Use combined identifier for faceted pages
-                        page_id = f"{year_range}_{str(page_num).zfill(4)}"
-                        yield (page_id, page_results)
-                        
-                except Exception as e:
-                    page_num = future_to_page[future]
-                    logger.error(f"Failed to fetch faceted page {page_num} for {year_range}: {e}")
+                    submit_next()
+        finally:
+            # Drop queued work; at most max_workers running requests are left to finish
+            for future in future_to_page:
+                future.cancel()
+            executor.shutdown(wait=True)
     
     def _iter_collection_with_faceting(self, collection_name: str,
                                      limit: Optional[int] = None) -> Generator[SearchResult, None, None]:
         """Generator version of _get_collection_with_faceting for streaming."""
         url = self.url_handler.get_collection_url(collection_name)
         
-        date_ranges = self._find_optimal_date_ranges(url)
+        partitions = self._plan_partitions(url)
+        
+        with closing(SeenIds(capacity=max(sum(p.count for p in partitions), 1000))) as seen:
+            yield from self._iter_partition_items(url, partitions, seen, limit)
+    
+    def _iter_partition_items(self, url: str, partitions: List[Partition], seen: SeenIds,
+                              limit: Optional[int] = None) -> Generator[SearchResult, None, None]:
         items_yielded = 0
         
-        for start_year, end_year in date_ranges:
+        for partition in partitions:
             if limit and items_yielded >= limit:
                 break
                 
@@ -466,103 +560,287 @@ class LocAPI:
             
             while True:
                 params = {
+                    **partition.params,
                     "c": per_page,
                     "sp": page,
-                    "fa": "digitized:true",
-                    "dates": f"{start_year}/{end_year}"
+                    "at": "results,pagination"
                 }
                 
                 data = self._make_request(url, params=params)
-                response = SearchResponse(**data)
+                results = self._parse_results(data)
                 
-                for result in response.results:
+                for result in results:
                     if limit and items_yielded >= limit:
                         return
+                    if not seen.add(self._result_id(result)):
+                        continue
                         
                     yield result
                     items_yielded += 1
                     
-                if response.pagination.next is None:
+                if data["pagination"].get("next") is None:
                     break
                     
                 page += 1
     
     def _iter_collection_pages_with_faceting(self, collection_name: str,
                                            limit: Optional[int] = None,
-                                           resume_dir: Optional[Path] = None) -> Generator[Tuple[Union[int, str], List[SearchResult]], None, None]:
-        """Generator version for pages with date faceting."""
+                                           resume_dir: Optional[Path] = None,
+                                           ordered: bool = True,
+                                           raw: bool = False) -> Generator[Tuple[Union[int, str], List[SearchResult]], None, None]:
+        """Generator version for pages with facet partitioning."""
         url = self.url_handler.get_collection_url(collection_name)
+        
+        # Partition counts come from the (possibly cached) plan, so no per-facet probe is needed
+        partitions = self._plan_partitions(url, resume_dir)
+        
+        # Facets overlap, so drop items already yielded from another partition. With a
+        # resume dir the seen ids persist, so resumed runs skip items written earlier.
+        if resume_dir:
+            resume_dir.mkdir(parents=True, exist_ok=True)
+        seen = SeenIds(resume_dir / "seen_ids.sqlite" if resume_dir else None,
+                       capacity=max(sum(p.count for p in partitions), 1000))
+        try:
+            yield from self._iter_partition_pages(url, partitions, seen, limit, resume_dir, ordered, raw)
+        finally:
+            seen.close()
+    
+    def _iter_partition_pages(self, url: str, partitions: List[Partition], seen: SeenIds,
+                              limit: Optional[int] = None,
+                              resume_dir: Optional[Path] = None,
+                              ordered: bool = True,
+                              raw: bool = False) -> Generator[Tuple[str, List[SearchResult]], None, None]:
         per_page = self.PAGE_SIZE
         
-        # Get date facets
-        date_facets = self._parse_date_facets(url)
+        # One task list across all partitions keeps the pool busy through partition boundaries
+        tasks = []
+        for partition in partitions:
+            total_pages = (partition.count + per_page - 1) // per_page
+            for page_num in range(1, total_pages + 1):
+                page_id = f"{partition.key}_{str(page_num).zfill(4)}"
+                tasks.append((page_id, {**partition.params, "c": per_page, "sp": page_num, "at": "results,pagination"}))
         
-        # Create output directory structure for date facets
-        items_yielded = 0
+        page_numbers = {page_id: number for number, (page_id, _) in enumerate(tasks)}
         
-        for facet in date_facets:
-            if limit and items_yielded >= limit:
-                break
-                
-            year_range = facet["year_range"]
-            facet_url = facet["link"]
-            
-            # Get total pages for this facet
-            facet_data = self._make_request(facet_url, params={"c": 1, "fo": "json"})
-            total_pages = (facet_data["pagination"]["total"] + per_page - 1) // per_page
-            
-            # Check existing pages for this facet (use resume_dir directly without subdirectory)
-            pages_to_fetch = self._check_existing_pages(resume_dir, total_pages, year_range) if resume_dir else list(range(1, total_pages + 1))
-            
-            if not pages_to_fetch:
-                # Count existing items for this facet to update items_yielded
-                if resume_dir:
-                    for page_file in resume_dir.glob(f"{year_range}_*.jsonl"):
-                        try:
-                            with open(page_file, 'r') as f:
-                                items_yielded += sum(1 for _ in f)
-                        except Exception:
-                            continue
-                continue
-            
-            # Download pages for this facet in parallel
-            logger.info(f"Downloading {len(pages_to_fetch)} pages for year range {year_range}")
+        tasks, items_yielded = self._resume_tasks(tasks, resume_dir, limit)
+        if not tasks:
+            return
+        
+        # Ids from pages after the checkpoint may have been committed without their
+        # results being saved (or the output was reset), so forget them
+        seen.discard_from(page_numbers[tasks[0][0]])
+        
+        logger.info(f"Downloading {len(tasks)} pages across {len(partitions)} partitions")
+        
+        def is_new(page_id: str, result: Union[SearchResult, Dict[str, Any]]) -> bool:
+            return seen.add(self._result_id(result), page_numbers[page_id])
+        
+        for page_id, page_results in self._fetch_tasks_parallel(
+            url, tasks, limit, items_yielded, result_filter=is_new, ordered=ordered, raw=raw
+        ):
+            yield (page_id, page_results)
             
-            # Use parallel fetching for this facet
-            for page_id, page_results in self._fetch_facet_pages_parallel(
-                facet_url, pages_to_fetch, per_page, year_range, limit, items_yielded
-            ):
-                items_yielded += len(page_results)
-                yield (page_id, page_results)
+            # The consumer has handled the page, so its ids can be made durable
+            seen.commit()
+        
+    def iter_changed_items(self, collection_name: str, index: MetadataIndex,
+                           since: Optional[str] = None, sort: Optional[str] = None,
+                           limit: Optional[int] = None,
+                           state_key: Optional[str] = None) -> Generator[ItemResponse, None, None]:
+        """Yield full item responses for the collection's new or changed items only.
+        
+        Changed results and items are upserted into ``index``. With ``sort`` paging stops at
+        the first page without changes. The start time is stored under ``state_key`` only
+        after a complete run without failures.
+        """
+        url = self.url_handler.get_collection_url(collection_name)
+        if sort:
+            pages = self._iter_sorted_pages(url, sort)
+        else:
+            # Ordered paging raises on a page that fails after retries, which would otherwise be
+            # skipped silently and its items left behind the new watermark
+            pages = self.iter_collection_pages(collection_name, ordered=True, raw=True)
+        
+        started = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        yielded = 0
+        failed = 0
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for page_id, page_results in pages:
+                changed = index.changed_results(page_results, since=since)
+                if not changed:
+                    if sort:
+                        logger.info(f"Page {page_id} has no new or changed items, stopping")
+                        break
+                    continue
+                if limit:
+                    changed = changed[:limit - yielded]
                 
-                if limit and items_yielded >= limit:
+                item_ids = [item_id_from(self._result_id(result)) for result in changed]
+                futures = [executor.submit(self.get_item, item_id, "item,resources") for item_id in item_ids]
+                
+                fetched_results, items = [], []
+                for result, item_id, future in zip(changed, item_ids, futures):
+                    try:
+                        items.append(future.result())
+                        fetched_results.append(result)
+                    except Exception as e:
+                        # Neither indexed nor covered by the new watermark, so the next refresh retries it
+                        logger.error(f"Failed to fetch item {item_id}: {e}")
+                        failed += 1
+                
+                index.upsert_items(items)
+                index.upsert_results(fetched_results)
+                logger.info(f"Page {page_id}: {len(items)} new or changed items")
+                
+                yield from items
+                yielded += len(items)
+                if limit and yielded >= limit:
+                    logger.info(f"Stopped at the limit of {limit} items, keeping the previous refresh time")
                     return
         
+        if failed:
+            logger.warning(f"{failed} items failed, keeping the previous refresh time")
+        elif state_key:
+            index.set_state(state_key, started)
+    
+    def iter_collection_item_pages(self, collection_name: str,
+                                   limit: Optional[int] = None,
+                                   resume_dir: Optional[Path] = None,
+                                   attributes: str = "item,resources"
+                                   ) -> Generator[Tuple[Union[int, str], List[ItemResponse]], None, None]:
+        """Yield (page_id, item responses) for each collection page, fetching every item in full.
+        
+        Items that fail after retries are left out and, with ``resume_dir``, listed in
+        ``failed_items.txt`` there. A resumed harvest fetches them again first.
+        """
+        pages = self.iter_collection_pages(collection_name, limit=limit, resume_dir=resume_dir, raw=True)
+        batches = ((page_id, [item_id_from(self._result_id(result)) for result in page_results])
+                   for page_id, page_results in pages)
+        failed_path = Path(resume_dir) / "failed_items.txt" if resume_dir else None
+        
+        retry = self._take_failed_items(Path(resume_dir)) if resume_dir else None
+        if retry:
+            logger.info(f"Fetching {len(retry[1])} previously failed items again")
+            # Written as a repeat of the checkpointed page, so the resume point stays valid
+            batches = itertools.chain([retry], batches)
+        
+        for page_id, items, _ in self._iter_item_batches(batches, attributes, failed_path):
+            yield (page_id, items)
+    
+    def _take_failed_items(self, resume_dir: Path) -> Optional[Tuple[Union[int, str], List[str]]]:
+        """Return the checkpointed page and the ids from ``failed_items.txt`` to fetch again.
+        
+        The ids are parked in ``retrying_items.json`` until a later checkpoint shows them written;
+        otherwise the next call puts them back.
+        """
+        failed_path = resume_dir / "failed_items.txt"
+        retrying_path = resume_dir / "retrying_items.json"
+        checkpoint = self._load_checkpoint(resume_dir)
+        
+        if retrying_path.exists():
+            with open(retrying_path, "r", encoding="utf-8") as f:
+                retrying = json.load(f)
+            # Any progress past the recorded item count includes the retried page
+            if not checkpoint or checkpoint["items"] <= retrying["items"]:
+                with open(failed_path, "a") as f:
+                    f.writelines(f"{item_id}\n" for item_id in retrying["ids"])
+            retrying_path.unlink()
+        
+        if not checkpoint:
+            # A harvest that starts over fetches every item with its page
+            failed_path.unlink(missing_ok=True)
+            return None
+        if not failed_path.exists():
+            return None
+        
+        with open(failed_path, "r") as f:
+            item_ids = list(dict.fromkeys(line.strip() for line in f if line.strip()))
+        if not item_ids:
+            return None
+        
+        with open(retrying_path, "w", encoding="utf-8") as f:
+            json.dump({"items": checkpoint["items"], "ids": item_ids}, f)
+        failed_path.unlink()
+        return (checkpoint["page"], item_ids)
+    
+    def _iter_item_batches(self, batches: Iterable[Tuple[Any, List[str]]], attributes: Optional[str] = None,
+                           failed_path: Optional[Path] = None
+                           ) -> Generator[Tuple[Any, List[ItemResponse], List[str]], None, None]:
+        """Fetch (batch_id, item ids) batches in parallel, yielding (batch_id, item responses, failed ids) in order.
+        
+        The next batch is queued while the current one completes. Failed ids are appended to ``failed_path``.
+        """
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        pending = []
+        
+        def submit(batch_id: Any, item_ids: List[str]):
+            pending.append((batch_id, [(item_id, executor.submit(self.get_item, item_id, attributes))
+                                       for item_id in item_ids]))
+        
+        def collect() -> Tuple[Any, List[ItemResponse], List[str]]:
+            batch_id, futures = pending.pop(0)
+            items, failed = [], []
+            for item_id, future in futures:
+                try:
+                    items.append(future.result())
+                except Exception as e:
+                    logger.error(f"Failed to fetch item {item_id}: {e}")
+                    failed.append(item_id)
+            if failed and failed_path:
+                with open(failed_path, "a") as f:
+                    f.writelines(f"{item_id}\n" for item_id in failed)
+            return (batch_id, items, failed)
+        
+        try:
+            for batch_id, item_ids in batches:
+                submit(batch_id, item_ids)
+                if len(pending) > 1:
+                    yield collect()
+            while pending:
+                yield collect()
+        finally:
+            # Cancel the items that have not started
+            for _, futures in pending:
+                for _, future in futures:
+                    future.cancel()
+            executor.shutdown(wait=True)
+    
+    def _iter_sorted_pages(self, url: str, sort: str) -> Generator[Tuple[int, List[Dict[str, Any]]], None, None]:
+        """Yield raw search pages one at a time in the ``sb`` sort order, up to the deep paging limit."""
+        per_page = self.PAGE_SIZE
+        for page in range(1, self.DEEP_PAGING_LIMIT // per_page + 1):
+            params = {"c": per_page, "sp": page, "at": "results,pagination", "fa": "digitized:true", "sb": sort}
+            data = self._make_request(url, params=params)
+            yield (page, data.get("results", []))
+            if data["pagination"].get("next") is None:
+                return
+        logger.warning(f"Reached the deep paging limit of {self.DEEP_PAGING_LIMIT} results in {sort} order")
+    
     def download_item_files(self, item_id: str, output_dir: str,
-                           mimetype: Optional[str] = None) -> List[str]:
+                           mimetype: Optional[str] = None,
+                           item_response: Optional[ItemResponse] = None) -> List[str]:
+        """Download the files of an item, reusing ``item_response`` if it was already fetched."""
         output_path = Path(output_dir)
         output_path.mkdir(parents=True, exist_ok=True)
         
-        item_response = self.get_item(item_id)
+        if item_response is None:
+            resources = self.get_item_resources(item_id)
+        else:
+            resources = item_response.resources
         
         downloaded_files = []
-        files_to_download = []
-        
-        for resource in item_response.resources:
-            for file_group in resource.files:
-                for file_info in file_group:
-                    if file_info.url:
-                        if not mimetype or file_info.mimetype == mimetype:
-                            files_to_download.append((file_info.url, file_info.mimetype))
+        files_to_download = self._get_item_files(resources, mimetype)
+        manifest = DownloadManifest(output_path)
                         
         logger.info(f"Found {len(files_to_download)} files to download")
         
         with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
             futures = {}
             
-            for url, file_mimetype in files_to_download:
-                future = executor.submit(self._download_file, url, output_path, item_id)
-                futures[future] = url
+            for file_info in files_to_download:
+                future = executor.submit(self._download_file, file_info.url, output_path, item_id,
+                                         expected_size=file_info.size, manifest=manifest)
+                futures[future] = file_info.url
                 
             with tqdm(total=len(futures), desc="Downloading files") as pbar:
                 for future in as_completed(futures):
@@ -576,27 +854,153 @@ class LocAPI:
                     
         return downloaded_files
         
+    @staticmethod
+    def _get_item_files(resources: List[Resource], mimetype: Optional[str] = None) -> List[FileInfo]:
+        """List the downloadable files of an item's resources, optionally filtered by MIME type."""
+        files = []
+        for resource in resources:
+            for file_group in resource.files:
+                for file_info in file_group:
+                    if file_info.url:
+                        if not mimetype or file_info.mimetype == mimetype:
+                            files.append(file_info)
+        return files
+        
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=2, max=10),
-        retry=retry_if_exception_type(requests.exceptions.RequestException),
+        retry=retry_if_exception_type((requests.exceptions.RequestException, RateLimitError)),
         before_sleep=before_sleep_log(logger, logging.WARNING)
     )
-    def _download_file(self, url: str, output_dir: Path, item_id: str) -> Optional[str]:
-        session = self.sessions.get("resource", self.default_session)
-        
-        response = session.get(url, timeout=60)
-        response.raise_for_status()
+    def _download_file(self, url: str, output_dir: Path, item_id: str,
+                       expected_size: Optional[int] = None,
+                       manifest: Optional[DownloadManifest] = None) -> Optional[str]:
+        """Download a file, resuming a previous partial download if one exists.
+        
+        Files recorded in ``manifest`` (or, without one, present with ``expected_size`` bytes)
+        are revalidated or skipped instead of downloaded again.
+        """
+        endpoint_type = self._get_endpoint_type(url)
+        session = self.sessions.get(endpoint_type, self.default_session)
+        controller = self.rate_controllers[endpoint_type]
+        
+        url_name = urlparse(url).path.strip("/").split("/")[-1]
+        
+        manifest_entry = manifest.get(url) if manifest else None
+        if manifest_entry:
+            existing = manifest.file_path(manifest_entry)
+            if expected_size is not None and expected_size == manifest_entry["size"]:
+                logger.debug(f"Skipping unchanged file {existing}")
+                return str(existing)
+        elif manifest is None and url_name and expected_size is not None:
+            existing = output_dir / url_name
+            if existing.exists() and existing.stat().st_size == expected_size:
+                logger.debug(f"Skipping complete file {existing}")
+                return str(existing)
+        
+        # Keyed by URL, since many different URLs share a file name
+        part_path = output_dir / f"{hashlib.sha1(url.encode()).hexdigest()}.part"
+        meta_path = part_path.with_name(part_path.name + ".json")
+        
+        meta = {}
+        offset = 0
+        headers = {}
+        if part_path.exists() and meta_path.exists():
+            try:
+                meta = json.loads(meta_path.read_text())
+            except ValueError:
+                meta = {}
+            if meta.get("url") == url:
+                offset = part_path.stat().st_size
+                headers["Range"] = f"bytes={offset}-"
+                if meta.get("etag"):
+                    headers["If-Range"] = meta["etag"]
+            else:
+                meta = {}
+        elif manifest_entry:
+            if manifest_entry.get("etag"):
+                headers["If-None-Match"] = manifest_entry["etag"]
+            if manifest_entry.get("last_modified"):
+                headers["If-Modified-Since"] = manifest_entry["last_modified"]
+        
+        controller.wait()
+        with session.get(url, headers=headers, timeout=60, stream=True) as response:
+            self._check_throttle(response, controller)
+            controller.on_success()
+            
+            if response.status_code == 304 and manifest_entry:
+                logger.debug(f"File not modified: {url}")
+                return str(manifest.file_path(manifest_entry))
+            
+            if response.status_code == 416 and offset:
+                if offset == meta.get("size"):
+                    # The previous run received every byte but stopped before the rename
+                    return self._finish_part_file(part_path, meta_path, output_dir / meta["filename"], manifest)
+                # The size is unknown or the file shrank, so the retry starts over from byte 0
+                part_path.unlink(missing_ok=True)
+                meta_path.unlink(missing_ok=True)
+            
+            response.raise_for_status()
+            
+            if response.status_code == 206:
+                logger.info(f"Resuming {url} at byte {offset}")
+                content_range = response.headers.get("Content-Range", "")
+                total = content_range.rsplit("/", 1)[-1]
+                total_size = int(total) if total.isdigit() else None
+            else:
+                # Range ignored or the file changed since the partial download
+                offset = 0
+                content_length = response.headers.get("Content-Length")
+                total_size = int(content_length) if content_length else None
+                meta = {
+                    "url": url,
+                    "etag": response.headers.get("ETag"),
+                    "last_modified": response.headers.get("Last-Modified"),
+                    "size": total_size,
+                    "filename": self._get_filename_from_url(url, response.headers, item_id),
+                }
+                meta_path.write_text(json.dumps(meta))
+            
+            with open(part_path, "ab" if offset else "wb") as f:
+                chunks = response.iter_content(chunk_size=self.DOWNLOAD_CHUNK_SIZE)
+                while True:
+                    with self._buffer_slots:
+                        chunk = next(chunks, None)
+                        if chunk is None:
+                            break
+                        f.write(chunk)
         
-        filename = self._get_filename_from_url(url, response.headers, item_id)
-        filepath = output_dir / filename
+        received = part_path.stat().st_size
+        if total_size is not None and received != total_size:
+            # Keep the partial file; the retry continues from where this attempt stopped
+            raise requests.exceptions.RequestException(
+                f"Incomplete download of {url}: {received} of {total_size} bytes"
+            )
         
-        with open(filepath, "wb") as f:
-            f.write(response.content)
-                    
+        return self._finish_part_file(part_path, meta_path, output_dir / meta["filename"], manifest)
+    
+    def _finish_part_file(self, part_path: Path, meta_path: Path, filepath: Path,
+                          manifest: Optional[DownloadManifest] = None) -> str:
+        if manifest:
+            meta = json.loads(meta_path.read_text())
+            filepath = manifest.claim(meta["url"], filepath)
+            digest = hashlib.sha256()
+            with open(part_path, "rb") as f:
+                for chunk in iter(lambda: f.read(self.DOWNLOAD_CHUNK_SIZE), b""):
+                    digest.update(chunk)
+        
+        # Only complete files ever appear under their final name
+        os.replace(part_path, filepath)
+        
+        if manifest:
+            manifest.record(meta["url"], filepath, filepath.stat().st_size,
+                            etag=meta.get("etag"), last_modified=meta.get("last_modified"),
+                            sha256=digest.hexdigest())
+        meta_path.unlink(missing_ok=True)
         return str(filepath)
             
-    def _get_filename_from_url(self, url: str, headers: Dict[str, str], item_id: str) -> str:
+    @staticmethod
+    def _get_filename_from_url(url: str, headers: Dict[str, str], item_id: str) -> str:
         content_disposition = headers.get("Content-Disposition", "")
         if content_disposition:
             filename_match = re.search(r'filename="([^"]+)"', content_disposition)
@@ -619,126 +1023,290 @@ class LocAPI:
     def download_collection_files(self, collection_name: str, output_dir: str,
                                  limit: Optional[int] = None,
                                  mimetype: Optional[str] = None) -> List[str]:
+        """Download the files of every item in a collection."""
+        def item_ids():
+            for _, page_results in self.iter_collection_pages(collection_name, limit=limit, ordered=False):
+                for result in page_results:
+                    yield item_id_from(self._result_id(result))
+        
+        return self._download_items_pipeline(item_ids(), output_dir, mimetype, f"collection {collection_name}")
+    
+    def download_items_files(self, items: Iterable[Union[str, Tuple[str, ItemResponse]]], output_dir: str,
+                             mimetype: Optional[str] = None,
+                             on_item_done: Optional[Callable[[str], None]] = None) -> List[str]:
+        """Download the files of many items, each into a directory named after its LCCN.
+        
+        ``items`` yields item ids or ``(item_id, ItemResponse)`` pairs. ``on_item_done(item_id)``
+        is called once all files of an item have downloaded.
+        """
+        return self._download_items_pipeline(iter(items), output_dir, mimetype, "items", on_item_done)
+    
+    def _download_items_pipeline(self, items: Iterator[Union[str, Tuple[str, ItemResponse]]], output_dir: str,
+                                 mimetype: Optional[str], source: str,
+                                 on_item_done: Optional[Callable[[str], None]] = None) -> List[str]:
+        """Run item listing -> item metadata -> file manifest -> file download as a pipeline."""
         output_path = Path(output_dir)
         output_path.mkdir(parents=True, exist_ok=True)
         
-        items = self.get_collection_items(collection_name, limit=limit)
+        metadata_workers = self.max_workers
+        download_workers = self.max_workers
         
+        item_queue = queue.Queue(maxsize=metadata_workers * 4)
+        metadata_queue = queue.Queue(maxsize=metadata_workers * 4)
+        file_queue = queue.Queue(maxsize=download_workers * 16)
+        
+        manifest = DownloadManifest(output_path)
         all_downloaded = []
+        lock = threading.Lock()
+        
+        # A failed stage stops the others from taking new work and is re-raised once they have drained
+        stage_errors = []
+        stop = threading.Event()
+        
+        def fail(message: str, error: Exception):
+            logger.error(f"{message}: {error}")
+            stage_errors.append((message, error))
+            stop.set()
+        pbar = tqdm(desc="Downloading files", unit="file")
+        
+        # Files still to download per item, and the items that had a failed file
+        remaining_files = {}
+        failed_items = set()
+        
+        def file_finished(item_id: str, ok: bool):
+            with lock:
+                remaining_files[item_id] -= 1
+                if not ok:
+                    failed_items.add(item_id)
+                item_done = remaining_files[item_id] == 0 and item_id not in failed_items
+                if remaining_files[item_id] == 0:
+                    del remaining_files[item_id]
+                    failed_items.discard(item_id)
+            if item_done and on_item_done:
+                on_item_done(item_id)
+        
+        def list_items():
+            try:
+                for item in items:
+                    if stop.is_set():
+                        break
+                    item_queue.put(item)
+            except Exception as e:
+                fail(f"Failed to list {source}", e)
+            finally:
+                for _ in range(metadata_workers):
+                    item_queue.put(_DONE)
         
-        for item in tqdm(items, desc="Processing items"):
-            item_id = item.id.split("/")[-2]
-            
+        def fetch_metadata():
+            while True:
+                item_id = item_queue.get()
+                if item_id is _DONE:
+                    metadata_queue.put(_DONE)
+                    return
+                if stop.is_set():
+                    continue
+                if isinstance(item_id, tuple):
+                    # Metadata supplied by the caller
+                    metadata_queue.put(item_id)
+                    continue
+                try:
+                    metadata_queue.put((item_id, self.get_item(item_id, attributes="item,resources")))
+                except Exception as e:
+                    logger.error(f"Failed to fetch metadata for item {item_id}: {e}")
+        
+        def build_manifest():
+            finished = 0
             try:
-                # Get full item data to check for LCCN
-                item_data = self.get_item(item_id)
-                if item_data.item.number_lccn:
-                    item_dir = output_path / item_data.item.number_lccn[0]
-                else:
-                    item_dir = output_path / item_id
-                
-                downloaded = self.download_item_files(item_id, str(item_dir), mimetype=mimetype)
-                all_downloaded.extend(downloaded)
+                while finished < metadata_workers:
+                    entry = metadata_queue.get()
+                    if entry is _DONE:
+                        finished += 1
+                        continue
+                    if stop.is_set():
+                        continue
+                    item_id, item_data = entry
+                    if item_data.item.number_lccn:
+                        item_dir = output_path / item_data.item.number_lccn[0]
+                    else:
+                        item_dir = output_path / item_id
+                    item_dir.mkdir(parents=True, exist_ok=True)
+                    
+                    files_to_download = self._get_item_files(item_data.resources, mimetype)
+                    if not files_to_download:
+                        if on_item_done:
+                            on_item_done(item_id)
+                        continue
+                    with lock:
+                        remaining_files[item_id] = remaining_files.get(item_id, 0) + len(files_to_download)
+                    for file_info in files_to_download:
+                        file_queue.put((file_info, item_dir, item_id))
             except Exception as e:
-                logger.error(f"Failed to download files for item {item_id}: {e}")
+                fail(f"Failed to queue files for {source}", e)
+                # Keep draining so no metadata worker blocks on a full queue
+                while finished < metadata_workers:
+                    if metadata_queue.get() is _DONE:
+                        finished += 1
+            finally:
+                for _ in range(download_workers):
+                    file_queue.put(_DONE)
+        
+        def download_files():
+            while True:
+                entry = file_queue.get()
+                if entry is _DONE:
+                    return
+                if stop.is_set():
+                    continue
+                file_info, item_dir, item_id = entry
+                ok = True
+                try:
+                    filepath = self._download_file(file_info.url, item_dir, item_id,
+                                                   expected_size=file_info.size, manifest=manifest)
+                    if filepath:
+                        with lock:
+                            all_downloaded.append(filepath)
+                except Exception as e:
+                    logger.error(f"Failed to download {file_info.url}: {e}")
+                    ok = False
+                try:
+                    file_finished(item_id, ok)
+                except Exception as e:
+                    fail(f"Failed to record item {item_id}", e)
+                pbar.update(1)
+        
+        threads = [threading.Thread(target=list_items, daemon=True),
+                   threading.Thread(target=build_manifest, daemon=True)]
+        threads += [threading.Thread(target=fetch_metadata, daemon=True) for _ in range(metadata_workers)]
+        threads += [threading.Thread(target=download_files, daemon=True) for _ in range(download_workers)]
+        
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            pbar.close()
+        
+        if stage_errors:
+            message, error = stage_errors[0]
+            raise LocAPIError(f"{message}: {error}") from error
                 
         return all_downloaded
         
     def save_metadata(self, data: Any, output_file: str):
+        """Save one record or a list of records as JSONL, or Parquet for a ``.parquet`` path."""
         output_path = Path(output_file)
         output_path.parent.mkdir(parents=True, exist_ok=True)
         
-        with open(output_path, "w", encoding="utf-8") as f:
-            if isinstance(data, (ItemResponse, SearchResult)):
-                # Single item - write as one line
-                f.write(json.dumps(data.model_dump(), ensure_ascii=False) + "\n")
-            elif isinstance(data, list):
-                # Multiple items - write each as a separate line
-                for item in data:
-                    if isinstance(item, SearchResult):
-                        f.write(json.dumps(item.model_dump(), ensure_ascii=False) + "\n")
-                    else:
-                        f.write(json.dumps(item, ensure_ascii=False) + "\n")
-            else:
-                # Fallback for other data types
-                f.write(json.dumps(data, ensure_ascii=False) + "\n")
+        with closing(open_sink(output_path, self.codec)) as sink:
+            sink.write(data if isinstance(data, (list, ResultStore)) else [data])
     
-    def save_metadata_streaming(self, data_generator: Generator[SearchResult, None, None], 
+    def save_metadata_streaming(self, data_generator: Generator[Union[SearchResult, Dict[str, Any]], None, None],
                               output_file: str, total: Optional[int] = None):
         """Save metadata in streaming mode, writing each item as it's received."""
         output_path = Path(output_file)
         output_path.parent.mkdir(parents=True, exist_ok=True)
         
-        with open(output_path, "w", encoding="utf-8") as f:
+        with closing(open_sink(output_path, self.codec)) as sink:
             with tqdm(total=total, desc="Saving metadata") as pbar:
                 for item in data_generator:
-                    f.write(json.dumps(item.model_dump(), ensure_ascii=False) + "\n")
-                    f.flush()  # Ensure data is written immediately
+                    sink.write([item])
                     pbar.update(1)
     
-    def save_metadata_resumable(self, page_generator: Generator[Tuple[Union[int, str], List[SearchResult]], None, None],
-                              output_file: str, total: Optional[int] = None):
-        """Save metadata with page-based resumability."""
+    def save_items_metadata(self, item_ids: Iterable[str], output_file: str, journal: BatchJournal,
+                            batch_size: int = 100):
+        """Fetch many items in parallel and append them to one output, recording progress in ``journal``.
+        
+        Each durable batch is journaled with its output offset, so a rerun skips it and drops
+        anything written after that offset. Failed ids are not journaled, so a rerun fetches them again.
+        """
         output_path = Path(output_file)
         output_path.parent.mkdir(parents=True, exist_ok=True)
         
-        # Create subdirectory for page files
-        pages_dir = output_path.parent / output_path.stem
-        pages_dir.mkdir(parents=True, exist_ok=True)
-        
-        # Count existing items for progress bar
-        existing_items = self._count_existing_items(pages_dir)
-        
-        # Save each page to a separate file
-        with tqdm(total=total, desc="Downloading metadata", initial=existing_items) as pbar:
-            for page_id, page_results in page_generator:
-                # Handle both numeric and string page IDs
-                if isinstance(page_id, int):
-                    page_file = pages_dir / f"{str(page_id).zfill(4)}.jsonl"
-                else:
-                    # For faceted pages with year ranges
-                    page_file = pages_dir / f"{page_id}.jsonl"
-                
-                # Save page results
-                with open(page_file, "w", encoding="utf-8") as f:
-                    for item in page_results:
-                        f.write(json.dumps(item.model_dump(), ensure_ascii=False) + "\n")
-                
-                pbar.update(len(page_results))
-        
-        # Merge all pages into final output file
-        logger.info("Merging page files into final output")
-        self._merge_page_files(pages_dir, output_path)
+        offset = journal.offsets.get(output_path.name, 0)
+        if offset and not sink_class(output_path).can_resume(output_path, offset):
+            raise LocAPIError(f"{output_path} is missing or shorter than its journal {journal.path}")
+        
+        def batches():
+            batch = []
+            for item_id in item_ids:
+                if journal.is_done("item", item_id):
+                    continue
+                batch.append(item_id)
+                if len(batch) >= batch_size:
+                    yield (batch, batch)
+                    batch = []
+            if batch:
+                yield (batch, batch)
+        
+        # Batches written since the last durable offset
+        pending_ids = []
+        with closing(open_sink(output_path, self.codec, offset)) as sink, \
+                tqdm(desc="Downloading metadata", unit="item") as pbar:
+            for batch_ids, items, failed in self._iter_item_batches(batches()):
+                written = sink.write(items)
+                pending_ids.extend(item_id for item_id in batch_ids if item_id not in failed)
+                if written is not None:
+                    offset = written
+                    journal.record("item", pending_ids, output=output_path.name, offset=offset)
+                    pending_ids = []
+                pbar.update(len(items))
+            
+            written = sink.flush()
+            if pending_ids:
+                journal.record("item", pending_ids, output=output_path.name,
+                               offset=written if written is not None else offset)
     
-    def _merge_page_files(self, pages_dir: Path, output_file: Path):
-        """Merge individual page files into a single output file."""
-        page_files = sorted(pages_dir.glob("*.jsonl"))
-        
-        if not page_files:
-            logger.warning("No page files found to merge")
-            return
+    def save_metadata_resumable(self, page_generator: Generator[Tuple[Union[int, str], List[SearchResult]], None, None],
+                              output_file: str, total: Optional[int] = None, keep_pages: bool = False):
+        """Stream pages into the output file with a checkpoint whenever they are durable.
         
-        with open(output_file, "w", encoding="utf-8") as out_f:
-            with tqdm(total=len(page_files), desc="Merging pages") as pbar:
-                for page_file in page_files:
-                    with open(page_file, "r", encoding="utf-8") as in_f:
-                        for line in in_f:
-                            out_f.write(line)
-                    pbar.update(1)
+        The last page id, item count and output offset go into a ``HarvestCheckpoint`` next
+        to the output, so a rerun cuts the output back and continues after that page.
+        ``keep_pages`` also saves every page to its own file there.
+        """
+        output_path = Path(output_file)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
         
-        logger.info(f"Merged {len(page_files)} pages into {output_file}")
-    
-    def _count_existing_items(self, pages_dir: Path) -> int:
-        """Count total items in existing page files."""
-        if not pages_dir.exists():
-            return 0
+        # The pages directory holds the resume state (and page files with keep_pages)
+        pages_dir = resume_dir_for(output_path)
+        pages_dir.mkdir(parents=True, exist_ok=True)
         
-        count = 0
-        for page_file in pages_dir.glob("*.jsonl"):
-            try:
-                with open(page_file, 'r') as f:
-                    count += sum(1 for _ in f)
-            except Exception:
-                continue
+        # Page files are compressed like the output they belong to
+        page_suffix = ".jsonl" + (output_path.suffix if output_path.suffix in COMPRESSIONS else "")
+        compress_page = compressor(COMPRESSIONS.get(output_path.suffix))
+        
+        with closing(HarvestCheckpoint(pages_dir)) as checkpoint:
+            last = checkpoint.last()
+            if last and not sink_class(output_path).can_resume(output_path, last["offset"]):
+                # Resuming would leave a hole, so drop the progress that no longer matches the output
+                logger.warning(f"{output_path} is missing or shorter than its checkpoint, starting over")
+                checkpoint.reset()
+                last = None
+            offset, items = (last["offset"], last["items"]) if last else (0, 0)
+            
+            # Pages written since the last checkpoint, recorded once the sink makes them durable
+            pending_page, pending_items = None, 0
+            
+            with closing(open_sink(output_path, self.codec, offset)) as sink, \
+                    tqdm(total=total, desc="Downloading metadata", initial=items) as pbar:
+                for page_id, page_results in page_generator:
+                    offset = sink.write(page_results)
+                    pending_page, pending_items = page_id, pending_items + len(page_results)
+                    
+                    if keep_pages:
+                        # Handle both numeric and faceted string page IDs
+                        page_name = str(page_id).zfill(4) if isinstance(page_id, int) else page_id
+                        with open(pages_dir / f"{page_name}{page_suffix}", "wb") as f:
+                            f.write(compress_page(b"".join(encode_jsonl(item, self.codec) for item in page_results)))
+                    
+                    if offset is not None:
+                        items = checkpoint.record_page(pending_page, pending_items, offset)
+                        pending_page, pending_items = None, 0
+                    pbar.update(len(page_results))
+                
+                offset = sink.flush()
+                if pending_page is not None and offset is not None:
+                    items = checkpoint.record_page(pending_page, pending_items, offset)
         
-        return count
\ No newline at end of file
+        logger.info(f"Saved {items} items to {output_path}")
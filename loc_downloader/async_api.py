@@ -0,0 +1,347 @@
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from contextlib import closing
+from typing import List, Optional, Dict, Any, Tuple, AsyncGenerator, Callable, Union
+from pathlib import Path
+
+import aiofiles
+import httpx
+from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type, before_sleep_log
+
+from .api import LocAPI
+from .codec import JSONCodec
+from .dedup import SeenIds
+from .exceptions import RateLimitError
+from .manifest import DownloadManifest
+from .models import ItemResponse, Resource, SearchResponse, SearchResult
+from .planner import FacetPartitionPlanner
+from .rate_control import AdaptiveRateController, parse_retry_after
+from .url_handler import LocURLHandler
+
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncTokenBucket:
+    """Token bucket for asyncio code: ``capacity`` tokens refilled at ``rate`` per second."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        # Waiters queue on the lock, so tokens are handed out in arrival order
+        async with self._lock:
+            self._refill()
+            if self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1
+
+
+class AsyncRateLimiter:
+    """Async equivalent of a ``LimiterSession`` built from one ``RATE_LIMITS`` entry.
+
+    ``per_second`` requests are allowed on average with up to ``per_second * burst``
+    in any ``burst``-second window, and no more than ``per_minute`` per minute.
+    """
+
+    def __init__(self, per_second: float, per_minute: float, burst: float = 1):
+        self.buckets = [
+            AsyncTokenBucket(rate=per_second, capacity=per_second * burst),
+            AsyncTokenBucket(rate=per_minute / 60, capacity=per_minute),
+        ]
+
+    async def acquire(self):
+        for bucket in self.buckets:
+            await bucket.acquire()
+
+
+class _SyncBridge:
+    """Blocking view of an ``AsyncLocAPI`` for ``FacetPartitionPlanner``, used from worker threads."""
+
+    def __init__(self, api: "AsyncLocAPI", loop: asyncio.AbstractEventLoop):
+        self.api = api
+        self.loop = loop
+        self.DEEP_PAGING_LIMIT = api.DEEP_PAGING_LIMIT
+        self.max_workers = min(api.max_concurrency, 10)
+
+    def _make_request(self, url: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        return asyncio.run_coroutine_threadsafe(self.api._make_request(url, params), self.loop).result()
+
+    def _parse_date_facets(self, base_url: str) -> List[Dict[str, Any]]:
+        data = self._make_request(base_url, params={"fa": "digitized:true", "fo": "json", "at": "facets"})
+        return LocAPI._date_facets_from_response(data)
+
+
+class AsyncLocAPI:
+    """Asyncio client for loc.gov built on ``httpx.AsyncClient``.
+
+    Use as an async context manager so the connection pool is closed::
+
+        async with AsyncLocAPI() as api:
+            item = await api.get_item("2021667925")
+    """
+
+    PAGE_SIZE = LocAPI.PAGE_SIZE
+    DEEP_PAGING_LIMIT = LocAPI.DEEP_PAGING_LIMIT
+    RATE_LIMITS = LocAPI.RATE_LIMITS
+
+    def __init__(self, max_concurrency: int = 100,
+                 rate_limits: Optional[Dict[str, Dict[str, float]]] = None,
+                 json_backend: Optional[str] = None):
+        self.url_handler = LocURLHandler()
+        self.codec = JSONCodec(json_backend)
+        self.rate_limits = {**self.RATE_LIMITS, **(rate_limits or {})}
+        self.limiters = {
+            endpoint: AsyncRateLimiter(**limits)
+            for endpoint, limits in self.rate_limits.items()
+        }
+        self.rate_controllers = {
+            endpoint: AdaptiveRateController(max_rate=min(limits["per_second"], limits["per_minute"] / 60))
+            for endpoint, limits in self.rate_limits.items()
+        }
+        self.client = httpx.AsyncClient(
+            headers={"User-Agent": "loc-downloader/0.1.0"},
+            limits=httpx.Limits(max_connections=max_concurrency,
+                                max_keepalive_connections=max_concurrency),
+            follow_redirects=True,
+        )
+        self.max_concurrency = max_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def __aenter__(self) -> "AsyncLocAPI":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def aclose(self):
+        await self.client.aclose()
+
+    def _get_endpoint_type(self, url: str) -> str:
+        return self.url_handler.get_endpoint_type(url)
+
+    async def _acquire(self, endpoint_type: str) -> AdaptiveRateController:
+        controller = self.rate_controllers[endpoint_type]
+        await asyncio.sleep(controller.delay())
+        await self.limiters[endpoint_type].acquire()
+        return controller
+
+    def _check_throttle(self, response: httpx.Response, controller: AdaptiveRateController):
+        if response.status_code in LocAPI.THROTTLE_STATUSES:
+            controller.on_throttle(parse_retry_after(response.headers.get("Retry-After")))
+            raise RateLimitError(f"Throttled with HTTP {response.status_code} for {response.url}")
+
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=2, max=60),
+        retry=retry_if_exception_type((httpx.HTTPError, RateLimitError)),
+        before_sleep=before_sleep_log(logger, logging.WARNING)
+    )
+    async def _make_request(self, url: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        endpoint_type = self._get_endpoint_type(url)
+
+        if params is None:
+            params = {}
+
+        params.setdefault("fo", "json")
+
+        async with self._semaphore:
+            controller = await self._acquire(endpoint_type)
+            started = time.monotonic()
+            response = await self.client.get(url, params=params, timeout=30)
+
+        self._check_throttle(response, controller)
+        controller.on_success(time.monotonic() - started)
+
+        response.raise_for_status()
+        return self.codec.loads(response.content)
+
+    async def get_item(self, item_id: str, attributes: Optional[str] = None) -> ItemResponse:
+        url = self.url_handler.get_item_url(item_id)
+        data = await self._make_request(url, params={"at": attributes} if attributes else None)
+        return ItemResponse(**data)
+
+    async def get_item_resources(self, item_id: str) -> List[Resource]:
+        url = self.url_handler.get_item_url(item_id)
+        data = await self._make_request(url, params={"at": "resources"})
+        return [Resource(**resource) for resource in data.get("resources", [])]
+
+    async def iter_collection_pages(self, collection_name: str,
+                                    limit: Optional[int] = None) -> AsyncGenerator[Tuple[Union[int, str], List[SearchResult]], None]:
+        """Async generator that yields (page_id, results) tuples as pages complete."""
+        url = self.url_handler.get_collection_url(collection_name)
+        per_page = self.PAGE_SIZE
+
+        initial_data = await self._make_request(url, params={"c": 1, "at": "pagination"})
+        total_results = initial_data["pagination"]["total"]
+
+        if total_results > self.DEEP_PAGING_LIMIT:
+            logger.info(f"Collection has {total_results} items, using date faceting")
+            # The planner is synchronous, so it runs on a thread and sends its requests back to this loop
+            loop = asyncio.get_running_loop()
+            planner = FacetPartitionPlanner(_SyncBridge(self, loop), url)
+            partitions = await loop.run_in_executor(None, planner.plan)
+
+            tasks = []
+            for partition in partitions:
+                total_pages = (partition.count + per_page - 1) // per_page
+                for page_num in range(1, total_pages + 1):
+                    page_id = f"{partition.key}_{str(page_num).zfill(4)}"
+                    tasks.append((page_id, url, {**partition.params, "c": per_page, "sp": page_num,
+                                                 "at": "results,pagination"}))
+
+            logger.info(f"Downloading {len(tasks)} pages across {len(partitions)} partitions")
+
+            # Facets overlap, so drop items already yielded from another partition
+            with closing(SeenIds(capacity=max(sum(p.count for p in partitions), 1000))) as seen:
+                def is_new(result: SearchResult) -> bool:
+                    return seen.add(LocAPI._result_id(result))
+
+                async for page_id, page_results in self._fetch_pages(tasks, limit, result_filter=is_new):
+                    yield (page_id, page_results)
+            return
+
+        total_pages = (total_results + per_page - 1) // per_page
+        if limit:
+            total_pages = min(total_pages, (limit + per_page - 1) // per_page)
+        tasks = [
+            (page_num, url, {"c": per_page, "sp": page_num, "fa": "digitized:true", "at": "results,pagination"})
+            for page_num in range(1, total_pages + 1)
+        ]
+
+        logger.info(f"Downloading {len(tasks)} pages")
+
+        async for page_id, page_results in self._fetch_pages(tasks, limit):
+            yield (page_id, page_results)
+
+    async def _fetch_pages(self, tasks: List[Tuple[Union[int, str], str, Dict[str, Any]]],
+                           limit: Optional[int] = None,
+                           result_filter: Optional[Callable[[SearchResult], bool]] = None
+                           ) -> AsyncGenerator[Tuple[Union[int, str], List[SearchResult]], None]:
+        """Fetch pages with at most ``max_concurrency`` of them in flight, yielding them as they complete."""
+        async def fetch_page(page_id, page_url, params):
+            data = await self._make_request(page_url, params=dict(params))
+            return page_id, SearchResponse(**data).results
+
+        task_iter = iter(tasks)
+        pending = set()
+        items_yielded = 0
+
+        def submit_next() -> bool:
+            for task in task_iter:
+                pending.add(asyncio.ensure_future(fetch_page(*task)))
+                return True
+            return False
+
+        try:
+            while len(pending) < self.max_concurrency and submit_next():
+                pass
+
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    pending.discard(future)
+                    try:
+                        page_id, page_results = future.result()
+                    except Exception as e:
+                        logger.error(f"Failed to fetch page: {e}")
+                        submit_next()
+                        continue
+
+                    if result_filter:
+                        page_results = [result for result in page_results if result_filter(result)]
+
+                    if limit:
+                        page_results = page_results[:limit - items_yielded]
+
+                    items_yielded += len(page_results)
+
+                    if page_results:
+                        yield (page_id, page_results)
+
+                    if limit and items_yielded >= limit:
+                        return
+
+                    submit_next()
+        finally:
+            for future in pending:
+                future.cancel()
+
+    async def download_item_files(self, item_id: str, output_dir: str,
+                                  mimetype: Optional[str] = None,
+                                  item_response: Optional[ItemResponse] = None) -> List[str]:
+        output_path = Path(output_dir)
+        output_path.mkdir(parents=True, exist_ok=True)
+
+        if item_response is None:
+            resources = await self.get_item_resources(item_id)
+        else:
+            resources = item_response.resources
+
+        files_to_download = [file_info.url for file_info in LocAPI._get_item_files(resources, mimetype)]
+        manifest = DownloadManifest(output_path)
+
+        logger.info(f"Found {len(files_to_download)} files to download")
+
+        results = await asyncio.gather(
+            *(self._download_file(url, output_path, item_id, manifest) for url in files_to_download),
+            return_exceptions=True
+        )
+
+        downloaded_files = []
+        for url, result in zip(files_to_download, results):
+            if isinstance(result, Exception):
+                logger.error(f"Failed to download {url}: {result}")
+            elif result:
+                downloaded_files.append(result)
+
+        return downloaded_files
+
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=2, max=10),
+        retry=retry_if_exception_type((httpx.HTTPError, RateLimitError)),
+        before_sleep=before_sleep_log(logger, logging.WARNING)
+    )
+    async def _download_file(self, url: str, output_dir: Path, item_id: str,
+                             manifest: Optional[DownloadManifest] = None) -> Optional[str]:
+        async with self._semaphore:
+            controller = await self._acquire(self._get_endpoint_type(url))
+            async with self.client.stream("GET", url, timeout=60) as response:
+                self._check_throttle(response, controller)
+                controller.on_success()
+                response.raise_for_status()
+
+                filename = LocAPI._get_filename_from_url(url, response.headers, item_id)
+                filepath = output_dir / filename
+                # One part file per URL; the final name is claimed once it is complete
+                temp_path = output_dir / f"{hashlib.sha1(url.encode()).hexdigest()}.part"
+
+                try:
+                    async with aiofiles.open(temp_path, "wb") as f:
+                        async for chunk in response.aiter_bytes(LocAPI.DOWNLOAD_CHUNK_SIZE):
+                            await f.write(chunk)
+                except BaseException:
+                    temp_path.unlink(missing_ok=True)
+                    raise
+
+        if manifest:
+            filepath = manifest.claim(url, filepath)
+        os.replace(temp_path, filepath)
+        if manifest:
+            manifest.record(url, filepath, filepath.stat().st_size, etag=response.headers.get("ETag"),
+                            last_modified=response.headers.get("Last-Modified"))
+        return str(filepath)
@@ -0,0 +1,130 @@
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Dict, Any, NamedTuple, Union
+from urllib.parse import urlparse, parse_qsl, urlencode, urlunparse
+
+
+logger = logging.getLogger(__name__)
+
+
+class CacheEntry(NamedTuple):
+    body: bytes
+    etag: Optional[str]
+    last_modified: Optional[str]
+    stored_at: float
+
+
+class ResponseCache:
+    """Persistent SQLite cache for API responses.
+
+    Entries are keyed by the normalized request URL. Entries younger than
+    ``ttl`` seconds are served without a request; older ones are revalidated
+    with ``If-None-Match``/``If-Modified-Since``. When the stored bodies exceed
+    ``max_bytes`` the least recently used entries are evicted.
+    """
+
+    def __init__(self, path: Union[str, Path], ttl: float = 86400,
+                 max_bytes: int = 1024 * 1024 * 1024):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                body BLOB NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                size INTEGER NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+        self._conn.commit()
+        self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    @staticmethod
+    def make_key(url: str, params: Optional[Dict[str, Any]] = None) -> str:
+        """Normalize a URL and its query parameters into a cache key."""
+        parsed = urlparse(url)
+        query = parse_qsl(parsed.query, keep_blank_values=True)
+        if params:
+            query.extend((k, str(v)) for k, v in params.items() if v is not None)
+        # Later values win, as they do when requests merges params into a URL
+        merged = dict(query)
+        return urlunparse((
+            parsed.scheme.lower(),
+            parsed.netloc.lower(),
+            parsed.path or "/",
+            "",
+            urlencode(sorted(merged.items())),
+            ""
+        ))
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, etag, last_modified, stored_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+        return CacheEntry(*row)
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        return time.time() - entry.stored_at < self.ttl
+
+    def conditional_headers(self, entry: CacheEntry) -> Dict[str, str]:
+        headers = {}
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def refresh(self, key: str):
+        """Mark an entry as revalidated, e.g. after a 304 response."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("UPDATE responses SET stored_at = ?, accessed_at = ? WHERE key = ?", (now, now, key))
+            self._conn.commit()
+
+    def set(self, key: str, body: bytes, etag: Optional[str] = None, last_modified: Optional[str] = None):
+        now = time.time()
+        size = len(body)
+        with self._lock:
+            row = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, body, etag, last_modified, now, now, size)
+            )
+            self._total_bytes += size - (row[0] if row else 0)
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        # Free down to 90% of the cap so every insert doesn't trigger another eviction
+        target = self.max_bytes * 0.9
+        cursor = self._conn.execute("SELECT key, size FROM responses ORDER BY accessed_at")
+        evicted = []
+        for key, size in cursor:
+            if self._total_bytes <= target:
+                break
+            evicted.append((key,))
+            self._total_bytes -= size
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", evicted)
+        logger.debug(f"Evicted {len(evicted)} cached responses")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
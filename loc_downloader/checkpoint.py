@@ -0,0 +1,84 @@
+import json
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Union
+
+
+logger = logging.getLogger(__name__)
+
+
+class HarvestCheckpoint:
+    """SQLite index of a metadata harvest's progress, kept in its resume directory.
+
+    Every completed page is recorded with its item count, the running item
+    total and the output offset after it, in the order the pages were
+    written. The facet plan is stored alongside, so loading the resume point
+    is one indexed lookup no matter how many pages have been written.
+    """
+
+    FILENAME = "checkpoint.sqlite"
+
+    def __init__(self, resume_dir: Union[str, Path]):
+        self.path = Path(resume_dir) / self.FILENAME
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS pages (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                page_id TEXT NOT NULL,
+                items INTEGER NOT NULL,
+                total_items INTEGER NOT NULL,
+                offset INTEGER NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self._conn.commit()
+
+    def last(self) -> Optional[Dict[str, Any]]:
+        """Return the most recently completed page as ``{"page", "offset", "items"}``."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT page_id, offset, total_items FROM pages ORDER BY seq DESC LIMIT 1"
+            ).fetchone()
+        if row is None:
+            return None
+        # Page ids are stored as JSON so numeric and faceted ids keep their type
+        return {"page": json.loads(row[0]), "offset": row[1], "items": row[2]}
+
+    def record_page(self, page_id: Union[int, str], items: int, offset: int) -> int:
+        """Record a completed page and return the number of items written so far."""
+        with self._lock:
+            row = self._conn.execute("SELECT total_items FROM pages ORDER BY seq DESC LIMIT 1").fetchone()
+            total_items = (row[0] if row else 0) + items
+            self._conn.execute(
+                "INSERT INTO pages (page_id, items, total_items, offset) VALUES (?, ?, ?, ?)",
+                (json.dumps(page_id), items, total_items, offset)
+            )
+            self._conn.commit()
+        return total_items
+
+    def get_plan(self) -> Optional[List[Dict[str, Any]]]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM state WHERE key = 'plan'").fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set_plan(self, plan: List[Dict[str, Any]]):
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO state VALUES ('plan', ?)", (json.dumps(plan),))
+            self._conn.commit()
+
+    def reset(self):
+        """Forget all completed pages, keeping the facet plan."""
+        with self._lock:
+            self._conn.execute("DELETE FROM pages")
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -1,11 +1,16 @@
 import logging
+import re
 import sys
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, List, Optional, TextIO, Tuple
 
 import click
 
 from .api import LocAPI
+from .codec import JSONCodec
+from .index import MetadataIndex
+from .journal import BatchJournal
+from .sinks import COMPRESSIONS, resume_dir_for
 from .exceptions import LocAPIError
 
 
@@ -15,6 +20,70 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+ISO_TIMESTAMP = re.compile(r"^\d{4}-\d{2}-\d{2}(T\d{2}:\d{2}(:\d{2}(\.\d+)?)?Z?)?$")
+
+
+def _with_compression(output: str, compress: Optional[str]) -> str:
+    """Add the extension selecting ``compress`` to a JSONL output path."""
+    if not compress:
+        return output
+    suffix = next(ext for ext, name in COMPRESSIONS.items() if name == compress)
+    return output if output.endswith(suffix) else output + suffix
+
+
+def _indexed_pages(page_generator, upsert):
+    """Pass pages through while upserting their records into an index with ``upsert``."""
+    for page_id, page_records in page_generator:
+        upsert(page_records)
+        yield page_id, page_records
+
+
+def _save_collection_metadata(api: LocAPI, identifier: str, output: str, limit: Optional[int], raw: bool,
+                              full_items: bool, keep_pages: bool, index: Optional[MetadataIndex]):
+    """Harvest a collection's metadata into ``output``, resuming from its checkpoint."""
+    # Get total count for progress bar
+    collection_url = api.url_handler.get_collection_url(identifier)
+    initial_data = api._make_request(collection_url, params={"c": 1, "at": "pagination"})
+    total = min(initial_data["pagination"]["total"], limit) if limit else initial_data["pagination"]["total"]
+    
+    # Determine pages directory holding the resume state
+    pages_dir = resume_dir_for(output)
+    
+    # Use page-based generator with resume capability
+    if full_items:
+        page_generator = api.iter_collection_item_pages(identifier, limit=limit, resume_dir=pages_dir)
+    else:
+        page_generator = api.iter_collection_pages(identifier, limit=limit, resume_dir=pages_dir, raw=raw)
+    if index:
+        page_generator = _indexed_pages(page_generator, index.upsert_items if full_items else index.upsert_results)
+    api.save_metadata_resumable(page_generator, output, total=total, keep_pages=keep_pages)
+
+
+def _read_inputs(api: LocAPI, stream: TextIO, journal: BatchJournal,
+                 collections: List[str]) -> Iterator[str]:
+    """Yield the item ids listed in ``stream`` that the journal has not recorded yet.
+    
+    Lines hold item or collection URLs or bare item ids; blank lines and
+    ``#`` comments are skipped. Collections are appended to ``collections``
+    to be processed after the items.
+    """
+    for number, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        try:
+            url_type, identifier = api.url_handler.parse_reference(line)
+        except ValueError as e:
+            logger.warning(f"Skipping input line {number}: {e}")
+            continue
+        if journal.is_done(url_type, identifier):
+            continue
+        if url_type == "collection":
+            if identifier not in collections:
+                collections.append(identifier)
+        else:
+            yield identifier
+
 
 @click.group()
 @click.version_option()
@@ -23,19 +92,79 @@ def main():
 
 
 @main.command()
-@click.argument("url")
-@click.option("--output", "-o", help="Output file path")
+@click.argument("url", required=False)
+@click.option("--input", "input_file", type=click.File("r"),
+              help="Read item/collection URLs or item ids from this file, one per line ('-' for stdin)")
+@click.option("--output", "-o", help="Output file path (.jsonl, or .parquet for a Parquet dataset directory); "
+                                     "with --input, the output directory")
 @click.option("--limit", "-l", type=int, help="Maximum number of items to fetch (collections only)")
 @click.option("--workers", "-w", default=10, type=int, help="Number of parallel workers for metadata fetching")
-def metadata(url: str, output: Optional[str], limit: Optional[int], workers: int):
-    api = LocAPI(max_workers=workers)
+@click.option("--cache", "cache_path", type=click.Path(dir_okay=False), help="SQLite file for caching API responses between runs")
+@click.option("--cache-ttl", default=86400, type=float, help="Seconds before cached responses are revalidated")
+@click.option("--keep-pages", is_flag=True, help="Also keep each page in its own file next to the output (collections only)")
+@click.option("--raw", is_flag=True, help="Write search results as received, without model validation (collections only)")
+@click.option("--json-backend", type=click.Choice(JSONCodec.BACKENDS), help="JSON library to use (default: fastest installed)")
+@click.option("--compress", type=click.Choice(["gzip", "zstd"]), help="Compress the JSONL output (also chosen by a .gz/.zst output path)")
+@click.option("--index", "index_path", type=click.Path(dir_okay=False), help="Also upsert the metadata into this local SQLite index")
+@click.option("--since", help="With --index, only fetch full items that are new or changed since this ISO "
+                              "timestamp, or since the last refresh with 'last' (collections only)")
+@click.option("--full-items", is_flag=True, help="Save the full item record (item and resources) of every "
+                                                 "collection item instead of its search result")
+@click.option("--sort", help="With --since, page in this search order (e.g. date_desc) and stop at the first "
+                             "page without changes")
+def metadata(url: Optional[str], input_file: Optional[TextIO], output: Optional[str], limit: Optional[int], workers: int,
+             cache_path: Optional[str], cache_ttl: float, keep_pages: bool, raw: bool,
+             json_backend: Optional[str], compress: Optional[str], index_path: Optional[str],
+             since: Optional[str], full_items: bool, sort: Optional[str]):
+    if bool(url) == bool(input_file):
+        raise click.UsageError("Pass either a URL or --input")
+    if input_file and (index_path or since):
+        raise click.UsageError("--index and --since do not apply to --input")
+    if compress and output and output.endswith(".parquet"):
+        raise click.BadParameter("Parquet output is compressed already", param_hint="--compress")
+    if since and not index_path:
+        raise click.UsageError("--since needs --index to compare against")
+    if since and since != "last" and not ISO_TIMESTAMP.match(since):
+        raise click.BadParameter("Expected 'last' or an ISO timestamp such as 2024-01-31T00:00:00Z",
+                                 param_hint="--since")
+    if full_items and (raw or since):
+        raise click.UsageError("--full-items cannot be combined with --raw or --since")
+    if sort and not since:
+        raise click.UsageError("--sort only applies with --since")
+    
+    api = LocAPI(max_workers=workers, cache_path=cache_path, cache_ttl=cache_ttl, json_backend=json_backend)
+    index = MetadataIndex(index_path, codec=api.codec) if index_path else None
     
     try:
+        if input_file:
+            output_dir = Path(output or ".")
+            journal = BatchJournal(output_dir, "metadata")
+            collections = []
+            try:
+                # Items stream through one shared pool; the collections found meanwhile follow
+                items_output = _with_compression(str(output_dir / "items.jsonl"), compress)
+                api.save_items_metadata(_read_inputs(api, input_file, journal, collections), items_output, journal)
+                click.echo(f"Item metadata saved to: {items_output}")
+                
+                for identifier in collections:
+                    click.echo(f"Fetching metadata for collection: {identifier}")
+                    name = f"{identifier}-items.jsonl" if full_items else f"{identifier}.jsonl"
+                    collection_output = _with_compression(str(output_dir / name), compress)
+                    _save_collection_metadata(api, identifier, collection_output, limit, raw, full_items,
+                                              keep_pages, None)
+                    journal.record("collection", [identifier])
+                    click.echo(f"Metadata saved to: {collection_output}")
+            finally:
+                journal.close()
+            return
+        
         url_type, identifier = api.parse_url(url)
         
         if url_type == "item":
             click.echo(f"Fetching metadata for item: {identifier}")
             data = api.get_item(identifier)
+            if index:
+                index.upsert_items([data])
             
             # Use LCCN for filename if available and no output specified
             if not output:
@@ -44,28 +173,34 @@ def metadata(url: str, output: Optional[str], limit: Optional[int], workers: int
                 else:
                     output = f"{identifier}.jsonl"
             
+            output = _with_compression(output, compress)
             api.save_metadata(data, output)
             click.echo(f"Metadata saved to: {output}")
             
+        elif url_type == "collection" and since:
+            state_key = f"refreshed:{identifier}"
+            if since == "last":
+                since = index.get_state(state_key)
+            click.echo(f"Refreshing collection: {identifier}" + (f" (changes since {since})" if since else ""))
+            
+            if not output:
+                output = f"{identifier}-changes.jsonl"
+            output = _with_compression(output, compress)
+            
+            changed_items = api.iter_changed_items(identifier, index, since=since, sort=sort, limit=limit,
+                                                   state_key=state_key)
+            api.save_metadata_streaming(changed_items, output)
+            click.echo(f"New and changed items saved to: {output}")
+            
         elif url_type == "collection":
             click.echo(f"Fetching metadata for collection: {identifier}")
             
             # Use collection slug for filename if no output specified
             if not output:
-                output = f"{identifier}.jsonl"
+                output = f"{identifier}-items.jsonl" if full_items else f"{identifier}.jsonl"
+            output = _with_compression(output, compress)
             
-            # Get total count for progress bar
-            collection_url = api.url_handler.get_collection_url(identifier)
-            initial_data = api._make_request(collection_url, params={"c": 1})
-            total = min(initial_data["pagination"]["total"], limit) if limit else initial_data["pagination"]["total"]
-            
-            # Determine pages directory for resumability
-            output_path = Path(output)
-            pages_dir = output_path.parent / output_path.stem
-            
-            # Use page-based generator with resume capability
-            page_generator = api.iter_collection_pages(identifier, limit=limit, resume_dir=pages_dir)
-            api.save_metadata_resumable(page_generator, output, total=total)
+            _save_collection_metadata(api, identifier, output, limit, raw, full_items, keep_pages, index)
             click.echo(f"Metadata saved to: {output}")
             
     except ValueError as e:
@@ -78,32 +213,90 @@ def metadata(url: str, output: Optional[str], limit: Optional[int], workers: int
         logger.exception("Unexpected error")
         click.echo(f"Unexpected error: {e}", err=True)
         sys.exit(1)
+    finally:
+        if index:
+            index.close()
+        api.close()
 
 
 @main.command()
-@click.argument("url")
+@click.argument("url", required=False)
+@click.option("--input", "input_file", type=click.File("r"),
+              help="Read item/collection URLs or item ids from this file, one per line ('-' for stdin)")
 @click.option("--output-dir", "-o", help="Output directory")
 @click.option("--mimetype", "-m", help="Filter files by MIME type (e.g., image/jpeg, application/pdf)")
-@click.option("--limit", "-l", type=int, help="Maximum number of items to process (collections only)")
+@click.option("--limit", "-l", type=int, help="Maximum number of items to process (collections and --index)")
+@click.option("--index", "index_path", type=click.Path(exists=True, dir_okay=False),
+              help="Take the items from this local index instead of a URL")
+@click.option("--format", "original_format", help="With --index, only items of this original format (e.g. map)")
+@click.option("--year-from", type=int, help="With --index, only items dated in or after this year")
+@click.option("--year-to", type=int, help="With --index, only items dated in or before this year")
 @click.option("--workers", "-w", default=10, type=int, help="Number of parallel download workers")
-def files(url: str, output_dir: Optional[str], mimetype: Optional[str], limit: Optional[int], workers: int):
-    api = LocAPI(max_workers=workers)
+@click.option("--cache", "cache_path", type=click.Path(dir_okay=False), help="SQLite file for caching API responses between runs")
+@click.option("--cache-ttl", default=86400, type=float, help="Seconds before cached responses are revalidated")
+@click.option("--max-buffer-mb", default=64, type=int, help="Maximum MB of file data buffered in memory across all workers")
+def files(url: Optional[str], input_file: Optional[TextIO], output_dir: Optional[str], mimetype: Optional[str], limit: Optional[int],
+          index_path: Optional[str], original_format: Optional[str], year_from: Optional[int],
+          year_to: Optional[int], workers: int, cache_path: Optional[str], cache_ttl: float, max_buffer_mb: int):
+    if sum(map(bool, (url, input_file, index_path))) != 1:
+        raise click.UsageError("Pass exactly one of a URL, --input or --index")
+    
+    api = LocAPI(max_workers=workers, cache_path=cache_path, cache_ttl=cache_ttl,
+                 max_buffer_bytes=max_buffer_mb * 1024 * 1024)
+    index = None
     
     try:
+        if index_path:
+            index = MetadataIndex(index_path, codec=api.codec)
+            
+            # Items whose files were never indexed are kept; their files are filtered after fetching
+            item_ids = index.query(mimetype=mimetype, original_format=original_format, year_from=year_from,
+                                   year_to=year_to, limit=limit, include_unindexed_files=True)
+            click.echo(f"Downloading files for {len(item_ids)} items from index: {index_path}")
+            
+            output_dir = output_dir or "."
+            downloaded = api.download_items_files(index.iter_work(item_ids), output_dir, mimetype=mimetype)
+            click.echo(f"Downloaded {len(downloaded)} files to: {output_dir}")
+            return
+        
+        if input_file:
+            output_dir = output_dir or "."
+            journal = BatchJournal(output_dir, "files")
+            collections = []
+            try:
+                # Items stream through one shared pipeline; the collections found meanwhile follow
+                downloaded = api.download_items_files(
+                    _read_inputs(api, input_file, journal, collections), output_dir, mimetype=mimetype,
+                    on_item_done=lambda item_id: journal.record("item", [item_id])
+                )
+                click.echo(f"Downloaded {len(downloaded)} item files to: {output_dir}")
+                
+                for identifier in collections:
+                    click.echo(f"Downloading files for collection: {identifier}")
+                    collection_dir = str(Path(output_dir) / identifier)
+                    downloaded = api.download_collection_files(identifier, collection_dir,
+                                                               limit=limit, mimetype=mimetype)
+                    journal.record("collection", [identifier])
+                    click.echo(f"Downloaded {len(downloaded)} files to: {collection_dir}")
+            finally:
+                journal.close()
+            return
+        
         url_type, identifier = api.parse_url(url)
         
         if url_type == "item":
             click.echo(f"Downloading files for item: {identifier}")
             
-            # Get item to check for LCCN
+            # Fetch the item once and reuse it for the LCCN and the file list
+            item_data = api.get_item(identifier, attributes="item,resources")
             if not output_dir:
-                item_data = api.get_item(identifier)
                 if item_data.item.number_lccn:
                     output_dir = item_data.item.number_lccn[0]
                 else:
                     output_dir = identifier
             
-            downloaded = api.download_item_files(identifier, output_dir, mimetype=mimetype)
+            downloaded = api.download_item_files(identifier, output_dir, mimetype=mimetype,
+                                                 item_response=item_data)
             click.echo(f"Downloaded {len(downloaded)} files to: {output_dir}")
             
         elif url_type == "collection":
@@ -129,6 +322,50 @@ def files(url: str, output_dir: Optional[str], mimetype: Optional[str], limit: O
         logger.exception("Unexpected error")
         click.echo(f"Unexpected error: {e}", err=True)
         sys.exit(1)
+    finally:
+        if index:
+            index.close()
+        api.close()
+
+
+@main.group()
+def index():
+    """Build and query a local SQLite index of harvested metadata."""
+    pass
+
+
+@index.command("add")
+@click.argument("paths", nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False))
+@click.option("--db", required=True, type=click.Path(dir_okay=False), help="Index database file")
+def index_add(paths: Tuple[str, ...], db: str):
+    """Upsert metadata JSONL files (.jsonl, .jsonl.gz or .jsonl.zst) into the index."""
+    metadata_index = MetadataIndex(db)
+    try:
+        for path in paths:
+            count = metadata_index.import_jsonl(path)
+            click.echo(f"Indexed {count} records from: {path}")
+    finally:
+        metadata_index.close()
+
+
+@index.command("query")
+@click.option("--db", required=True, type=click.Path(exists=True, dir_okay=False), help="Index database file")
+@click.option("--mimetype", "-m", help="Only items with files of this MIME type")
+@click.option("--format", "original_format", help="Only items of this original format (e.g. map)")
+@click.option("--year-from", type=int, help="Only items dated in or after this year")
+@click.option("--year-to", type=int, help="Only items dated in or before this year")
+@click.option("--lccn", help="Only the item with this LCCN")
+@click.option("--limit", "-l", type=int, help="Maximum number of item ids to print")
+def index_query(db: str, mimetype: Optional[str], original_format: Optional[str], year_from: Optional[int],
+                year_to: Optional[int], lccn: Optional[str], limit: Optional[int]):
+    """Print the ids of indexed items matching all filters."""
+    metadata_index = MetadataIndex(db)
+    try:
+        for item_id in metadata_index.query(mimetype=mimetype, original_format=original_format,
+                                            year_from=year_from, year_to=year_to, lccn=lccn, limit=limit):
+            click.echo(item_id)
+    finally:
+        metadata_index.close()
 
 
 if __name__ == "__main__":
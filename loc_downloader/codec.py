@@ -0,0 +1,52 @@
+import json
+import logging
+from typing import Any, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+logger = logging.getLogger(__name__)
+
+
+class JSONCodec:
+    """JSON encoding and decoding through the fastest installed backend.
+
+    ``orjson`` is preferred, then ``msgspec``, then the standard library.
+    Whatever the backend, ``loads`` accepts bytes or str and ``dumps`` returns
+    compact UTF-8 bytes with non-ASCII characters left unescaped.
+    """
+
+    BACKENDS = ("orjson", "msgspec", "json")
+
+    def __init__(self, backend: Optional[str] = None):
+        available = {"orjson": orjson is not None, "msgspec": msgspec is not None, "json": True}
+        if backend is None:
+            backend = next(name for name in self.BACKENDS if available[name])
+        elif backend not in available:
+            raise ValueError(f"Unknown JSON backend {backend!r}, expected one of {', '.join(self.BACKENDS)}")
+        elif not available[backend]:
+            raise ValueError(f"JSON backend {backend!r} is not installed")
+        self.backend = backend
+
+        if backend == "orjson":
+            self.loads = orjson.loads
+            self.dumps = orjson.dumps
+        elif backend == "msgspec":
+            self.loads = msgspec.json.Decoder().decode
+            self.dumps = msgspec.json.Encoder().encode
+        else:
+            self.loads = json.loads
+            self.dumps = self._json_dumps
+        logger.debug(f"Using {backend} for JSON")
+
+    @staticmethod
+    def _json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
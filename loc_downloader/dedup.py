@@ -0,0 +1,106 @@
+import hashlib
+import logging
+import math
+import os
+import sqlite3
+import tempfile
+from pathlib import Path
+from typing import Optional, Union
+
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings."""
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, value: str):
+        digest = hashlib.blake2b(value.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, value: str) -> bool:
+        """Add a value, returning True if it may already have been present."""
+        present = True
+        for position in self._positions(value):
+            byte, bit = divmod(position, 8)
+            if not self.bits[byte] & (1 << bit):
+                present = False
+                self.bits[byte] |= 1 << bit
+        return present
+
+
+class SeenIds:
+    """Memory-bounded set of item ids for deduplicating results.
+
+    A Bloom filter screens ids before an exact SQLite lookup. New ids are written by
+    ``commit`` and tagged with their page for ``discard_from``. Without a ``path`` a
+    temporary file is used.
+    """
+
+    BATCH_SIZE = 10000
+
+    def __init__(self, path: Optional[Union[str, Path]] = None,
+                 capacity: int = 10_000_000, error_rate: float = 0.001):
+        self._temporary = path is None
+        if path is None:
+            fd, path = tempfile.mkstemp(suffix=".sqlite", prefix="loc-seen-")
+            os.close(fd)
+        self.path = Path(path)
+
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS seen (id TEXT PRIMARY KEY, page INTEGER NOT NULL) WITHOUT ROWID")
+        self._pending = {}
+
+        self.bloom = BloomFilter(capacity, error_rate)
+        existing = 0
+        for (item_id,) in self._conn.execute("SELECT id FROM seen"):
+            self.bloom.add(item_id)
+            existing += 1
+        if existing:
+            logger.info(f"Loaded {existing} previously seen ids from {self.path}")
+
+    def add(self, item_id: str, page: int = 0) -> bool:
+        """Record an id, returning True if it had not been seen before."""
+        if self.bloom.add(item_id):
+            if item_id in self._pending:
+                return False
+            if self._conn.execute("SELECT 1 FROM seen WHERE id = ?", (item_id,)).fetchone():
+                return False
+
+        self._pending[item_id] = page
+        if len(self._pending) >= self.BATCH_SIZE:
+            self.commit()
+        return True
+
+    def commit(self):
+        if self._pending:
+            self._conn.executemany("INSERT OR IGNORE INTO seen VALUES (?, ?)", self._pending.items())
+            self._conn.commit()
+            self._pending.clear()
+
+    def discard_from(self, page: int):
+        """Forget the ids first seen on ``page`` or any later page.
+
+        The Bloom filter cannot drop them, but a false "maybe seen" only
+        costs an exact lookup that then reports the id as new.
+        """
+        self._pending = {i: p for i, p in self._pending.items() if p < page}
+        deleted = self._conn.execute("DELETE FROM seen WHERE page >= ?", (page,)).rowcount
+        self._conn.commit()
+        if deleted:
+            logger.info(f"Discarded {deleted} ids seen on pages that were not saved")
+
+    def close(self):
+        if self._temporary:
+            self._conn.close()
+            self.path.unlink(missing_ok=True)
+        else:
+            self.commit()
+            self._conn.close()
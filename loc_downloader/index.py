@@ -0,0 +1,284 @@
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from .codec import JSONCodec
+from .models import ItemResponse, LazyRecord, SearchResult
+from .sinks import iter_jsonl
+
+
+logger = logging.getLogger(__name__)
+
+
+def item_id_from(value: str) -> str:
+    """Return the item id from an item URL such as ``https://www.loc.gov/item/2021667925/`` or a bare id."""
+    return value.rstrip("/").split("/")[-1]
+
+
+class MetadataIndex:
+    """Local SQLite index of harvested item metadata.
+
+    Search results and full item responses are upserted by item id, so
+    re-importing a harvest only updates what changed. Item responses are
+    also flattened into ``resources`` and ``files`` rows. Items can then be
+    selected by LCCN, date, original format and file MIME type without
+    touching the API.
+    """
+
+    def __init__(self, path: Union[str, Path], codec: Optional[JSONCodec] = None):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.codec = codec or JSONCodec()
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS items (
+                item_id TEXT PRIMARY KEY,
+                title TEXT,
+                date TEXT,
+                lccn TEXT,
+                result TEXT,
+                item TEXT,
+                updated_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS items_lccn ON items (lccn);
+            CREATE INDEX IF NOT EXISTS items_date ON items (date);
+
+            CREATE TABLE IF NOT EXISTS formats (
+                item_id TEXT NOT NULL,
+                format TEXT NOT NULL,
+                PRIMARY KEY (item_id, format)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS formats_format ON formats (format, item_id);
+
+            CREATE TABLE IF NOT EXISTS resources (
+                item_id TEXT NOT NULL,
+                resource INTEGER NOT NULL,
+                url TEXT,
+                PRIMARY KEY (item_id, resource)
+            ) WITHOUT ROWID;
+
+            CREATE TABLE IF NOT EXISTS files (
+                item_id TEXT NOT NULL,
+                resource INTEGER NOT NULL,
+                file_group INTEGER NOT NULL,
+                position INTEGER NOT NULL,
+                url TEXT,
+                mimetype TEXT,
+                size INTEGER,
+                width INTEGER,
+                height INTEGER,
+                PRIMARY KEY (item_id, resource, file_group, position)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS files_mimetype ON files (mimetype, item_id);
+
+            CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+        """)
+        self._conn.commit()
+
+    @staticmethod
+    def _first(value: Any) -> Optional[str]:
+        if isinstance(value, list):
+            return value[0] if value else None
+        return value
+
+    @staticmethod
+    def _result_data(result: Union[SearchResult, LazyRecord, Dict[str, Any]]) -> Dict[str, Any]:
+        if isinstance(result, LazyRecord):
+            return result.data
+        if isinstance(result, SearchResult):
+            return result.model_dump()
+        return result
+
+    def _set_formats(self, item_id: str, formats: Optional[List[str]]):
+        if formats is None:
+            return
+        self._conn.execute("DELETE FROM formats WHERE item_id = ?", (item_id,))
+        self._conn.executemany("INSERT OR IGNORE INTO formats VALUES (?, ?)",
+                               ((item_id, f) for f in formats if f))
+
+    def upsert_results(self, results: Iterable[Union[SearchResult, LazyRecord, Dict[str, Any]]]) -> int:
+        """Insert or update search results, returning how many were written."""
+        count = 0
+        now = time.time()
+        with self._lock:
+            for result in results:
+                data = self._result_data(result)
+                item_id = item_id_from(data["id"])
+                self._conn.execute("""
+                    INSERT INTO items (item_id, title, date, lccn, result, updated_at) VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (item_id) DO UPDATE SET
+                        title = excluded.title, date = excluded.date,
+                        lccn = COALESCE(excluded.lccn, lccn),
+                        result = excluded.result, updated_at = excluded.updated_at
+                """, (item_id, data.get("title"), data.get("date"), self._first(data.get("number_lccn")),
+                      self.codec.dumps(data).decode("utf-8"), now))
+                self._set_formats(item_id, data.get("original_format"))
+                count += 1
+            self._conn.commit()
+        return count
+
+    def upsert_items(self, items: Iterable[ItemResponse]) -> int:
+        """Insert or update full item responses with their resources and files."""
+        count = 0
+        now = time.time()
+        with self._lock:
+            for response in items:
+                data = response.model_dump()
+                item = data["item"]
+                item_id = item_id_from(item["id"])
+                self._conn.execute("""
+                    INSERT INTO items (item_id, title, date, lccn, item, updated_at) VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (item_id) DO UPDATE SET
+                        title = excluded.title, date = COALESCE(excluded.date, date),
+                        lccn = COALESCE(excluded.lccn, lccn),
+                        item = excluded.item, updated_at = excluded.updated_at
+                """, (item_id, item.get("title"), item.get("date"), self._first(item.get("number_lccn")),
+                      response.model_dump_json(), now))
+                self._set_formats(item_id, item.get("original_format"))
+
+                self._conn.execute("DELETE FROM resources WHERE item_id = ?", (item_id,))
+                self._conn.execute("DELETE FROM files WHERE item_id = ?", (item_id,))
+                for r, resource in enumerate(response.resources):
+                    self._conn.execute("INSERT INTO resources VALUES (?, ?, ?)", (item_id, r, resource.url))
+                    self._conn.executemany(
+                        "INSERT INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        ((item_id, r, g, p, f.url, f.mimetype, f.size, f.width, f.height)
+                         for g, group in enumerate(resource.files) for p, f in enumerate(group))
+                    )
+                count += 1
+            self._conn.commit()
+        return count
+
+    def changed_results(self, results: Iterable[Union[SearchResult, LazyRecord, Dict[str, Any]]],
+                        since: Optional[str] = None) -> List[Any]:
+        """Return the results that are new or changed compared to the index.
+
+        A result is new if its id is not indexed. An indexed result has
+        changed if its ``timestamp`` is later than ``since`` (an ISO 8601 UTC
+        timestamp or date), or, without ``since``, if its ``timestamp`` or
+        ``date`` differ from the indexed record.
+        """
+        results = list(results)
+        data = [self._result_data(result) for result in results]
+        ids = [item_id_from(d["id"]) for d in data]
+
+        stored = {}
+        with self._lock:
+            # Stay well below SQLite's bound parameter limit
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                rows = self._conn.execute(f"""
+                    SELECT item_id, date,
+                           COALESCE(json_extract(result, '$.timestamp'), json_extract(item, '$.timestamp'))
+                    FROM items WHERE item_id IN ({", ".join("?" * len(chunk))})
+                """, chunk)
+                stored.update((row[0], row[1:]) for row in rows)
+
+        changed = []
+        for result, d, item_id in zip(results, data, ids):
+            if item_id not in stored:
+                changed.append(result)
+                continue
+            date, timestamp = stored[item_id]
+            if since is not None:
+                if d.get("timestamp") and d["timestamp"].rstrip("Z") > since.rstrip("Z"):
+                    changed.append(result)
+            elif d.get("timestamp") != timestamp or d.get("date") != date:
+                changed.append(result)
+        return changed
+
+    def get_state(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_state(self, key: str, value: str):
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO state VALUES (?, ?)", (key, value))
+            self._conn.commit()
+
+    def import_jsonl(self, path: Union[str, Path], batch_size: int = 1000) -> int:
+        """Upsert every record of a metadata JSONL file (plain, ``.gz`` or ``.zst``).
+
+        Lines holding an ``item`` object are item responses; all others are
+        search results.
+        """
+        count = 0
+        results, items = [], []
+        for record in iter_jsonl(path, self.codec):
+            if isinstance(record.get("item"), dict):
+                items.append(ItemResponse(**record))
+            else:
+                results.append(record)
+            if len(results) + len(items) >= batch_size:
+                count += self.upsert_results(results) + self.upsert_items(items)
+                results, items = [], []
+        count += self.upsert_results(results) + self.upsert_items(items)
+        logger.debug(f"Indexed {count} records from {path}")
+        return count
+
+    def query(self, mimetype: Optional[str] = None, original_format: Optional[str] = None,
+              year_from: Optional[int] = None, year_to: Optional[int] = None,
+              lccn: Optional[str] = None, limit: Optional[int] = None,
+              include_unindexed_files: bool = False) -> List[str]:
+        """Return the ids of the items matching every given filter.
+
+        ``mimetype`` matches items with at least one file of that type. With
+        ``include_unindexed_files`` items whose files are not indexed (only
+        their search result is known) match as well.
+        """
+        clauses, params = [], []
+        if mimetype:
+            clause = "item_id IN (SELECT item_id FROM files WHERE mimetype = ?)"
+            if include_unindexed_files:
+                clause = f"({clause} OR item IS NULL)"
+            clauses.append(clause)
+            params.append(mimetype)
+        if original_format:
+            clauses.append("item_id IN (SELECT item_id FROM formats WHERE format = ?)")
+            params.append(original_format)
+        if year_from is not None:
+            clauses.append("date >= ?")
+            params.append(str(year_from))
+        if year_to is not None:
+            # Dates are ISO strings, so everything in year_to sorts before year_to + 1
+            clauses.append("date < ?")
+            params.append(str(year_to + 1))
+        if lccn:
+            clauses.append("lccn = ?")
+            params.append(lccn)
+
+        sql = "SELECT item_id FROM items"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY item_id"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        with self._lock:
+            return [row[0] for row in self._conn.execute(sql, params)]
+
+    def get_item(self, item_id: str) -> Optional[ItemResponse]:
+        """Return the indexed item response, if the full item has been indexed."""
+        with self._lock:
+            row = self._conn.execute("SELECT item FROM items WHERE item_id = ?", (item_id,)).fetchone()
+        if row is None or row[0] is None:
+            return None
+        return ItemResponse(**self.codec.loads(row[0]))
+
+    def iter_work(self, item_ids: Iterable[str]) -> Iterator[Union[str, Tuple[str, ItemResponse]]]:
+        """Yield ``(item_id, ItemResponse)`` for indexed items and bare ids for the rest."""
+        for item_id in item_ids:
+            item = self.get_item(item_id)
+            yield (item_id, item) if item else item_id
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
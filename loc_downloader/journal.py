@@ -0,0 +1,63 @@
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Union
+
+from .manifest import read_jsonl_log
+
+
+logger = logging.getLogger(__name__)
+
+
+class BatchJournal:
+    """Append-only JSONL record of the inputs a batch ``command`` has finished.
+
+    Each command keeps its own journal file, so finishing an item's metadata
+    does not mark its files as downloaded.
+    """
+
+    FILENAME = ".loc-{command}-journal.jsonl"
+
+    def __init__(self, root: Union[str, Path], command: str):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.path = self.root / self.FILENAME.format(command=command)
+        self.done = set()
+        self.offsets: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+        for entry in read_jsonl_log(self.path):
+            self.done.update(entry["done"])
+            if "output" in entry:
+                self.offsets[entry["output"]] = entry["offset"]
+        if self.done:
+            logger.info(f"Resuming batch: {len(self.done)} inputs already done")
+
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    @staticmethod
+    def key(kind: str, identifier: str) -> str:
+        return f"{kind}:{identifier}"
+
+    def is_done(self, kind: str, identifier: str) -> bool:
+        return self.key(kind, identifier) in self.done
+
+    def record(self, kind: str, identifiers: Iterable[str], output: Optional[str] = None,
+               offset: Optional[int] = None):
+        """Record inputs as done, and the offset ``output`` had once they were written to it."""
+        keys = [self.key(kind, identifier) for identifier in identifiers]
+        entry = {"done": keys}
+        if output is not None:
+            entry["output"] = output
+            entry["offset"] = offset
+        with self._lock:
+            self._file.write(json.dumps(entry) + "\n")
+            self._file.flush()
+            self.done.update(keys)
+            if output is not None:
+                self.offsets[output] = offset
+
+    def close(self):
+        with self._lock:
+            self._file.close()
@@ -0,0 +1,105 @@
+import hashlib
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import Optional, Dict, Any, Iterator, Union
+
+
+logger = logging.getLogger(__name__)
+
+
+def read_jsonl_log(path: Path) -> Iterator[Dict[str, Any]]:
+    """Yield the entries of an append-only JSONL log, if it exists."""
+    if not path.exists():
+        return
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                # A torn final line from an interrupted run
+                continue
+
+
+class DownloadManifest:
+    """Record of the files downloaded into an output directory.
+
+    Each downloaded URL maps to its path (relative to the output directory),
+    size, ETag, Last-Modified and SHA-256 checksum. The manifest is an
+    append-only JSONL file where the last line for a URL wins, so recording a
+    download is a single append and an interrupted run never corrupts it.
+    """
+
+    FILENAME = ".loc-manifest.jsonl"
+
+    def __init__(self, root: Union[str, Path]):
+        self.root = Path(root)
+        self.path = self.root / self.FILENAME
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+        # Relative paths handed out to a URL, so no two URLs share a file
+        self._claims: Dict[str, str] = {}
+
+        lines = 0
+        for entry in read_jsonl_log(self.path):
+            self.entries[entry["url"]] = entry
+            lines += 1
+        for entry in self.entries.values():
+            self._claims[entry["path"]] = entry["url"]
+
+        if lines > 2 * len(self.entries) + 100:
+            self._compact()
+
+    def _compact(self):
+        temp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            for entry in self.entries.values():
+                f.write(json.dumps(entry) + "\n")
+        temp_path.replace(self.path)
+        logger.debug(f"Compacted download manifest {self.path}")
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """Return the entry for ``url`` if its file is still on disk with the recorded size."""
+        entry = self.entries.get(url)
+        if entry is None:
+            return None
+        filepath = self.root / entry["path"]
+        if not filepath.exists() or filepath.stat().st_size != entry["size"]:
+            return None
+        return entry
+
+    def claim(self, url: str, filepath: Path) -> Path:
+        """Return the path to store ``url`` at: its recorded path, ``filepath``, or a URL-derived name if taken."""
+        with self._lock:
+            entry = self.entries.get(url)
+            if entry is not None:
+                return self.root / entry["path"]
+            filepath = Path(filepath)
+            relative = str(filepath.relative_to(self.root))
+            if self._claims.setdefault(relative, url) != url:
+                # LoC file names such as IIIF's default.jpg repeat across URLs
+                digest = hashlib.sha1(url.encode()).hexdigest()[:10]
+                filepath = filepath.with_name(f"{filepath.stem}-{digest}{filepath.suffix}")
+                self._claims[str(filepath.relative_to(self.root))] = url
+            return filepath
+
+    def file_path(self, entry: Dict[str, Any]) -> Path:
+        return self.root / entry["path"]
+
+    def record(self, url: str, filepath: Path, size: int, etag: Optional[str] = None,
+               last_modified: Optional[str] = None, sha256: Optional[str] = None):
+        entry = {
+            "url": url,
+            "path": str(Path(filepath).relative_to(self.root)),
+            "size": size,
+            "etag": etag,
+            "last_modified": last_modified,
+            "sha256": sha256,
+        }
+        with self._lock:
+            self.entries[url] = entry
+            self._claims[entry["path"]] = url
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
@@ -1,4 +1,4 @@
-from typing import List, Optional, Dict, Any, Union
+from typing import List, Optional, Dict, Any, Union, Generic, Type, TypeVar
 from pydantic import BaseModel, Field, field_validator, ConfigDict
 from datetime import datetime
 
@@ -103,4 +103,38 @@ class Collection(BaseModel):
     id: str
     title: str
     description: Optional[str] = None
-    item_count: Optional[int] = None
\ No newline at end of file
+    item_count: Optional[int] = None
+
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+class LazyRecord(Generic[ModelT]):
+    """An API record kept as its decoded dict until one of its fields is read.
+    
+    The first attribute access validates the whole record into ``model`` and
+    later accesses reuse that instance. Item access (``record["id"]``) reads
+    the raw dict without validating, and writers serialize the raw dict, so
+    records that are only passed through are never validated at all.
+    """
+    
+    __slots__ = ("model", "data", "_validated")
+    
+    def __init__(self, model: Type[ModelT], data: Dict[str, Any]):
+        self.model = model
+        self.data = data
+        self._validated = None
+        
+    def validate(self) -> ModelT:
+        if self._validated is None:
+            self._validated = self.model(**self.data)
+        return self._validated
+    
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.validate(), name)
+    
+    def __getitem__(self, key: str) -> Any:
+        return self.data[key]
+    
+    def __repr__(self) -> str:
+        return f"LazyRecord({self.model.__name__}, id={self.data.get('id')!r})"
@@ -0,0 +1,126 @@
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Dict, Any, TYPE_CHECKING
+from urllib.parse import urlparse, parse_qs
+
+from pydantic import BaseModel
+
+if TYPE_CHECKING:
+    from .api import LocAPI
+
+
+logger = logging.getLogger(__name__)
+
+
+class Partition(BaseModel):
+    """A facet-filtered slice of a collection small enough to page through."""
+
+    key: str  # Filename-safe identifier, used as the page file prefix
+    params: Dict[str, str]  # Query parameters selecting this slice
+    count: int
+
+
+class FacetPartitionPlanner:
+    """Split a collection into partitions that each fit under the deep paging limit.
+
+    Date ranges from the collection's date facets are bisected with count-only
+    queries until every range fits or covers a single year. A single year that
+    is still too large is split by whichever of ``SECONDARY_FACETS`` has the
+    smallest largest value, using the counts from one facets request. The
+    top-level date facets are planned concurrently on ``max_workers`` threads.
+    """
+
+    SECONDARY_FACETS = ("original_format", "partof")
+
+    def __init__(self, api: "LocAPI", url: str, max_count: Optional[int] = None,
+                 max_workers: Optional[int] = None):
+        self.api = api
+        self.url = url
+        self.max_count = max_count or api.DEEP_PAGING_LIMIT
+        self.max_workers = max_workers or api.max_workers
+
+    def plan(self) -> List[Partition]:
+        facets = self.api._parse_date_facets(self.url)
+        partitions = []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for facet_partitions in executor.map(self._plan_facet, facets):
+                partitions.extend(facet_partitions)
+
+        logger.info(f"Planned {len(partitions)} partitions, largest has "
+                    f"{max((p.count for p in partitions), default=0)} items")
+        return partitions
+
+    def _plan_facet(self, facet: Dict[str, Any]) -> List[Partition]:
+        years = re.match(r"(\d{4})-(\d{4})$", facet["year_range"])
+        if years:
+            return self._split_dates({"fa": "digitized:true"}, int(years.group(1)), int(years.group(2)), facet["count"])
+
+        # Keep facets we cannot interpret as-is, selected by their own link
+        params = {k: v[0] for k, v in parse_qs(urlparse(facet["link"]).query).items() if k != "fo"}
+        return [Partition(key=self._slug(facet["year_range"]), params=params, count=facet["count"])]
+
+    def _count(self, params: Dict[str, str]) -> int:
+        data = self.api._make_request(self.url, params={**params, "c": 1, "at": "pagination"})
+        return data["pagination"]["total"]
+
+    def _split_dates(self, params: Dict[str, str], start: int, end: int, count: int) -> List[Partition]:
+        date_params = {**params, "dates": f"{start}/{end}"}
+        key = f"{start}-{end}"
+
+        if count <= self.max_count:
+            return [Partition(key=key, params=date_params, count=count)] if count else []
+        if start == end:
+            return self._split_secondary(key, date_params, count)
+
+        mid = (start + end) // 2
+        return (self._split_dates(params, start, mid, self._count({**params, "dates": f"{start}/{mid}"}))
+                + self._split_dates(params, mid + 1, end, self._count({**params, "dates": f"{mid + 1}/{end}"})))
+
+    def _split_secondary(self, key: str, params: Dict[str, str], count: int,
+                         used: tuple = ()) -> List[Partition]:
+        data = self.api._make_request(self.url, params={**params, "at": "facets"})
+
+        best = None
+        for facet in data.get("facets", []) or []:
+            field = facet.get("type")
+            filters = [f for f in facet.get("filters", []) if f.get("count", 0) > 0]
+            if field not in self.SECONDARY_FACETS or field in used or not filters:
+                continue
+            largest = max(f["count"] for f in filters)
+            if best is None or largest < best[0]:
+                best = (largest, field, filters)
+
+        if best is None:
+            logger.warning(f"Partition {key} has {count} items and cannot be split further; "
+                           f"results past {self.max_count} will be missing")
+            return [Partition(key=key, params=params, count=count)]
+
+        _, field, filters = best
+        covered = sum(f["count"] for f in filters)
+        if covered < count:
+            logger.warning(f"{field} facet values cover {covered} of {count} items in partition {key}")
+
+        partitions = []
+        for facet_filter in filters:
+            value = self._facet_value(facet_filter, field)
+            child_params = {**params, "fa": f"{params['fa']}|{field}:{value}"}
+            child_key = f"{key}.{field}-{self._slug(value)}"
+            if facet_filter["count"] <= self.max_count:
+                partitions.append(Partition(key=child_key, params=child_params, count=facet_filter["count"]))
+            else:
+                partitions.extend(self._split_secondary(child_key, child_params, facet_filter["count"], used + (field,)))
+        return partitions
+
+    @staticmethod
+    def _facet_value(facet_filter: Dict[str, Any], field: str) -> str:
+        # The filter link carries the exact value the API expects in fa=
+        for fa in parse_qs(urlparse(facet_filter.get("on", "")).query).get("fa", []):
+            for part in fa.split("|"):
+                if part.startswith(f"{field}:"):
+                    return part[len(field) + 1:]
+        return facet_filter.get("term") or facet_filter.get("title", "")
+
+    @staticmethod
+    def _slug(value: str) -> str:
+        return re.sub(r"[^A-Za-z0-9-]+", "-", value).strip("-").lower()
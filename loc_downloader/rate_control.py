@@ -0,0 +1,75 @@
+import logging
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+
+logger = logging.getLogger(__name__)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a ``Retry-After`` header given either in seconds or as an HTTP date."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class AdaptiveRateController:
+    """AIMD (additive-increase, multiplicative-decrease) pacing for one endpoint class.
+
+    A throttling response pauses every worker until ``Retry-After`` has passed and cuts
+    the rate by ``decrease``; each success adds ``increase`` back, up to ``max_rate``.
+    Only delays are computed, so threads and asyncio tasks can share a controller.
+    """
+
+    def __init__(self, max_rate: float, min_rate: Optional[float] = None,
+                 increase: Optional[float] = None, decrease: float = 0.5,
+                 default_block: float = 300):
+        self.max_rate = max_rate
+        self.min_rate = min_rate or max_rate / 20
+        self.increase = increase or max_rate / 50
+        self.decrease = decrease
+        self.default_block = default_block
+
+        self.rate = max_rate
+        self.next_slot = 0.0
+        self.blocked_until = 0.0
+        self.latency = None
+        self.best_latency = None
+        self._lock = threading.Lock()
+
+    def delay(self) -> float:
+        """Reserve the next send slot and return how long to wait for it."""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot, self.blocked_until)
+            self.next_slot = slot + 1 / self.rate
+            return slot - now
+
+    def wait(self):
+        delay = self.delay()
+        if delay > 0:
+            time.sleep(delay)
+
+    def on_success(self, latency: Optional[float] = None):
+        with self._lock:
+            if latency is not None:
+                self.latency = latency if self.latency is None else 0.8 * self.latency + 0.2 * latency
+                self.best_latency = min(self.best_latency or self.latency, self.latency)
+                if self.latency > 2 * self.best_latency:
+                    return
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def on_throttle(self, retry_after: Optional[float] = None):
+        with self._lock:
+            block = retry_after if retry_after is not None else self.default_block
+            self.blocked_until = max(self.blocked_until, time.monotonic() + block)
+            self.rate = max(self.min_rate, self.rate * self.decrease)
+            logger.warning(f"Throttled by server, pausing {block:.0f}s and reducing rate to {self.rate:.2f}/s")
@@ -0,0 +1,261 @@
+import gzip
+import io
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Type, Union, get_args, get_origin
+
+from pydantic import BaseModel
+
+from .codec import JSONCodec
+from .models import LazyRecord, SearchResult
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+logger = logging.getLogger(__name__)
+
+
+def encode_jsonl(record: Any, codec: JSONCodec) -> bytes:
+    """Serialize a model, lazy record or raw result dict as one JSONL line."""
+    if isinstance(record, BaseModel):
+        # Pydantic serializes straight to JSON, skipping the intermediate dict
+        return record.model_dump_json().encode("utf-8") + b"\n"
+    if isinstance(record, LazyRecord):
+        return codec.dumps(record.data) + b"\n"
+    return codec.dumps(record) + b"\n"
+
+
+COMPRESSIONS = {".gz": "gzip", ".zst": "zstd"}
+
+
+def compressor(compression: Optional[str]) -> Callable[[bytes], bytes]:
+    """Return a function compressing data into one self-contained gzip member or zstd frame."""
+    if compression == "gzip":
+        return lambda data: gzip.compress(data, mtime=0)
+    if compression == "zstd":
+        if zstandard is None:
+            raise ImportError("zstd compression requires zstandard: pip install loc-downloader[zstd]")
+        return zstandard.ZstdCompressor().compress
+    return lambda data: data
+
+
+def iter_jsonl(path: Union[str, Path], codec: JSONCodec) -> Iterable[Any]:
+    """Decode the records of a JSONL file written by ``JSONLSink``, compressed or not."""
+    path = Path(path)
+    compression = COMPRESSIONS.get(path.suffix)
+    if compression == "gzip":
+        # gzip reads concatenated members as one stream
+        f = gzip.open(path, "rb")
+    elif compression == "zstd":
+        if zstandard is None:
+            raise ImportError("zstd compression requires zstandard: pip install loc-downloader[zstd]")
+        f = io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(
+            open(path, "rb"), read_across_frames=True, closefd=True))
+    else:
+        f = open(path, "rb")
+
+    with f:
+        for line in f:
+            if line.strip():
+                yield codec.loads(line)
+
+
+class JSONLSink:
+    """Write records as JSON lines, compressed for ``.gz`` and ``.zst`` paths.
+
+    Uncompressed writes are flushed immediately. Compressed output is
+    buffered up to ``FRAME_BYTES`` and written as independent gzip members
+    or zstd frames, which standard tools decompress as one stream. Offsets
+    are byte positions in the file and always fall on a frame boundary, so a
+    sink reopened at an offset drops whatever was written after it.
+    """
+
+    FRAME_BYTES = 1024 * 1024
+
+    def __init__(self, path: Union[str, Path], codec: JSONCodec, offset: int = 0):
+        self.path = Path(path)
+        self.codec = codec
+        self.compression = COMPRESSIONS.get(self.path.suffix)
+        self._compress = compressor(self.compression)
+        self._buffer: List[bytes] = []
+        self._buffered = 0
+
+        self._file = open(self.path, "r+b" if offset else "wb")
+        self._file.truncate(offset)
+        self._file.seek(offset)
+
+    @staticmethod
+    def can_resume(path: Path, offset: int) -> bool:
+        return path.exists() and path.stat().st_size >= offset
+
+    def write(self, records: Iterable[Any]) -> Optional[int]:
+        """Write records, returning the offset once they are durable."""
+        data = b"".join(encode_jsonl(record, self.codec) for record in records)
+        self._buffer.append(data)
+        self._buffered += len(data)
+
+        if not self.compression or self._buffered >= self.FRAME_BYTES:
+            return self.flush()
+        return None
+
+    def flush(self) -> Optional[int]:
+        if self._buffer:
+            self._file.write(self._compress(b"".join(self._buffer)))
+            self._buffer = []
+            self._buffered = 0
+        self._file.flush()
+        return self._file.tell()
+
+    def close(self):
+        self.flush()
+        self._file.close()
+
+
+class ParquetSink:
+    """Write records as a directory of Parquet files with one row group each.
+
+    Model fields become columns and unknown fields go into a JSON ``extra`` column.
+    A row group is written every ``row_group_size`` rows or ``FLUSH_SECONDS``, and
+    offsets count the finished files.
+    """
+
+    ROW_GROUP_SIZE = 50000
+    FLUSH_SECONDS = 300
+
+    def __init__(self, path: Union[str, Path], codec: JSONCodec, offset: int = 0,
+                 model: Optional[Type[BaseModel]] = None, row_group_size: Optional[int] = None):
+        if pa is None:
+            raise ImportError("Parquet output requires pyarrow: pip install loc-downloader[parquet]")
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.codec = codec
+        self.model = model
+        self.row_group_size = row_group_size or self.ROW_GROUP_SIZE
+        self.parts = offset
+
+        # Files past the offset hold rows that were never checkpointed
+        for part in self.path.glob("part-*.parquet"):
+            if int(part.stem.split("-")[1]) >= offset:
+                part.unlink()
+
+        self._rows: List[Dict[str, Any]] = []
+        self._buffered_since = None
+        self._schema = None
+        self._json_fields: List[str] = []
+
+    @classmethod
+    def _part_path(cls, path: Path, index: int) -> Path:
+        return path / f"part-{index:05d}.parquet"
+
+    @classmethod
+    def can_resume(cls, path: Path, offset: int) -> bool:
+        return offset == 0 or cls._part_path(path, offset - 1).exists()
+
+    @classmethod
+    def _arrow_type(cls, annotation: Any) -> Optional["pa.DataType"]:
+        """Map a field annotation to an Arrow type, or None to store it as JSON."""
+        origin = get_origin(annotation)
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        if origin is Union:
+            return cls._arrow_type(args[0]) if len(args) == 1 else None
+        if origin is list:
+            item_type = cls._arrow_type(args[0]) if args else None
+            return pa.list_(item_type) if item_type is not None and not pa.types.is_list(item_type) else None
+        return {str: pa.string(), int: pa.int64(), float: pa.float64(), bool: pa.bool_()}.get(annotation)
+
+    def _build_schema(self, record: Any):
+        if self.model is None:
+            if isinstance(record, LazyRecord):
+                self.model = record.model
+            elif isinstance(record, BaseModel):
+                self.model = type(record)
+            else:
+                self.model = SearchResult
+
+        fields = []
+        for name, field in self.model.model_fields.items():
+            arrow_type = self._arrow_type(field.annotation)
+            if arrow_type is None:
+                self._json_fields.append(name)
+                arrow_type = pa.string()
+            fields.append(pa.field(name, arrow_type))
+        fields.append(pa.field("extra", pa.string()))
+        self._schema = pa.schema(fields)
+
+    def _row(self, record: Any) -> Dict[str, Any]:
+        if isinstance(record, LazyRecord):
+            record = record.validate()
+        elif not isinstance(record, BaseModel):
+            record = self.model(**record)
+
+        data = record.model_dump()
+        row = {name: data.pop(name, None) for name in self.model.model_fields}
+        for name in self._json_fields:
+            if row[name] is not None:
+                row[name] = self.codec.dumps(row[name]).decode("utf-8")
+        row["extra"] = self.codec.dumps(data).decode("utf-8") if data else None
+        return row
+
+    def write(self, records: Iterable[Any]) -> Optional[int]:
+        """Buffer records, returning an offset only when a row group was written."""
+        for record in records:
+            if self._schema is None:
+                self._build_schema(record)
+            self._rows.append(self._row(record))
+        if self._rows and self._buffered_since is None:
+            self._buffered_since = time.monotonic()
+
+        if (len(self._rows) >= self.row_group_size
+                or (self._rows and time.monotonic() - self._buffered_since >= self.FLUSH_SECONDS)):
+            return self.flush()
+        return None
+
+    def flush(self) -> Optional[int]:
+        if not self._rows:
+            return None
+
+        table = pa.Table.from_pylist(self._rows, schema=self._schema)
+        part_path = self._part_path(self.path, self.parts)
+        temp_path = part_path.with_name(f".{part_path.name}.tmp")
+        pq.write_table(table, temp_path, row_group_size=len(self._rows))
+        os.replace(temp_path, part_path)
+
+        logger.debug(f"Wrote {len(self._rows)} rows to {part_path}")
+        self._rows = []
+        self._buffered_since = None
+        self.parts += 1
+        return self.parts
+
+    def close(self):
+        self.flush()
+
+
+def open_sink(path: Union[str, Path], codec: JSONCodec, offset: int = 0) -> Union[JSONLSink, ParquetSink]:
+    """Open the sink matching the output path, Parquet for ``.parquet`` and JSONL otherwise."""
+    return sink_class(path)(path, codec, offset)
+
+
+def sink_class(path: Union[str, Path]) -> Type[Union[JSONLSink, ParquetSink]]:
+    return ParquetSink if Path(path).suffix == ".parquet" else JSONLSink
+
+
+def resume_dir_for(path: Union[str, Path]) -> Path:
+    """The directory next to an output file that holds its resume state and page files."""
+    path = Path(path)
+    name = path.name
+    for suffix in (*COMPRESSIONS, ".parquet", ".jsonl"):
+        if name.endswith(suffix) and name != suffix:
+            name = name[:-len(suffix)]
+    return path.parent / name
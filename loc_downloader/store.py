@@ -0,0 +1,97 @@
+import logging
+import os
+import tempfile
+import threading
+import weakref
+from array import array
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Optional, Type, Union
+
+from pydantic import BaseModel
+
+from .codec import JSONCodec
+from .models import LazyRecord, SearchResult
+from .sinks import encode_jsonl
+
+
+logger = logging.getLogger(__name__)
+
+
+class ResultStore(Sequence):
+    """Append-only sequence of records spilled to a JSONL file on disk.
+
+    Only record offsets are kept in memory. Without a ``path`` the records go to a
+    temporary file that is removed on ``close``.
+    """
+
+    def __init__(self, path: Optional[Union[str, Path]] = None, codec: Optional[JSONCodec] = None,
+                 model: Type[BaseModel] = SearchResult, lazy: bool = False):
+        if path is None:
+            fd, path = tempfile.mkstemp(suffix=".jsonl", prefix="loc-results-")
+            os.close(fd)
+            self._cleanup = weakref.finalize(self, os.unlink, path)
+        else:
+            self._cleanup = None
+        self.path = Path(path)
+        self.codec = codec or JSONCodec()
+        self.model = model
+        self.lazy = lazy
+
+        self._offsets = array("Q")
+        self._writer = open(self.path, "wb")
+        self._reader = open(self.path, "rb")
+        self._end = 0
+        self._lock = threading.Lock()
+
+    def append(self, record: Any):
+        line = encode_jsonl(record, self.codec)
+        with self._lock:
+            self._writer.write(line)
+            self._offsets.append(self._end)
+            self._end += len(line)
+
+    def extend(self, records: Iterable[Any]):
+        for record in records:
+            self.append(record)
+
+    def _decode(self, line: bytes) -> Any:
+        data = self.codec.loads(line)
+        return LazyRecord(self.model, data) if self.lazy else self.model(**data)
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        offset = self._offsets[index]
+        with self._lock:
+            self._writer.flush()
+            self._reader.seek(offset)
+            line = self._reader.readline()
+        return self._decode(line)
+
+    def __iter__(self) -> Iterator[Any]:
+        # A separate handle lets iteration interleave with appends and random access
+        with self._lock:
+            self._writer.flush()
+            count = len(self._offsets)
+        with open(self.path, "rb") as f:
+            for _ in range(count):
+                yield self._decode(f.readline())
+
+    def __repr__(self) -> str:
+        return f"ResultStore({len(self)} records at {self.path})"
+
+    def close(self):
+        self._writer.close()
+        self._reader.close()
+        if self._cleanup:
+            self._cleanup()
+
+    def __enter__(self) -> "ResultStore":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -8,8 +8,23 @@ class LocURLHandler:
     
     BASE_URL = "https://www.loc.gov"
     
+    # Hosts that answer the JSON API on the same paths as BASE_URL
+    API_HOSTS = ("www.loc.gov", "loc.gov")
+    
+    # Path prefixes on the API hosts mapped to rate limit classes, checked in order.
+    # Anything unmatched is an "other" endpoint, which shares the collections limits.
+    ENDPOINT_ROUTES = (
+        (re.compile(r"^/item/"), "item"),
+        (re.compile(r"^/resource/"), "resource"),
+        (re.compile(r"^/newspapers/"), "newspapers"),
+        (re.compile(r"^/(search|collections)/"), "collections"),
+        (re.compile(r"^/(audio|books|film-and-videos|legislation|manuscripts|maps|photos|"
+                    r"notated-music|web-archives)/"), "collections"),
+    )
+    
     def __init__(self, base_url: Optional[str] = None):
         self.base_url = base_url or self.BASE_URL
+        self.api_hosts = set(self.API_HOSTS) | {urlparse(self.base_url).netloc.lower()}
     
     def parse_url(self, url: str) -> Tuple[str, str]:
         """Parse a LoC URL to determine its type and identifier.
@@ -37,7 +52,23 @@ class LocURLHandler:
             return 'collection', collection_match.group(1)
         
         raise ValueError(f"Invalid LoC URL: {url}")
-    
+
+    def parse_reference(self, reference: str) -> Tuple[str, str]:
+        """Parse a LoC URL or a bare item id such as ``2021667925``.
+
+        Args:
+            reference: The URL or item id to parse
+
+        Returns:
+            Tuple of (url_type, identifier) as returned by parse_url
+
+        Raises:
+            ValueError: If the reference is neither an item id nor a valid LoC URL
+        """
+        if re.fullmatch(r"[\w.-]+", reference):
+            return 'item', reference
+        return self.parse_url(reference)
+
     def get_item_url(self, item_id: str, format: str = "json") -> str:
         """Construct URL for an item endpoint.
         
@@ -105,7 +136,26 @@ class LocURLHandler:
         Returns:
             True if this is a resource URL
         """
-        return "/resources/" in url
+        return "/resource/" in url
+    
+    def get_endpoint_type(self, url: str) -> str:
+        """Classify a URL into the rate limit class that governs it.
+        
+        Args:
+            url: The URL to classify
+            
+        Returns:
+            One of 'item', 'resource', 'newspapers', 'collections' for API
+            endpoints, or 'files' for static file hosts such as tile.loc.gov
+        """
+        parsed = urlparse(url)
+        if parsed.netloc.lower() not in self.api_hosts:
+            return "files"
+        
+        for pattern, endpoint_type in self.ENDPOINT_ROUTES:
+            if pattern.match(parsed.path):
+                return endpoint_type
+        return "collections"
     
     def add_params_to_url(self, url: str, params: Dict[str, Any]) -> str:
         """Add query parameters to a URL.
@@ -34,6 +34,11 @@ setup(
         "aiofiles>=23.0",
         "httpx>=0.24",
     ],
+    extras_require={
+        "fast": ["orjson>=3.8"],
+        "parquet": ["pyarrow>=10.0"],
+        "zstd": ["zstandard>=0.18"],
+    },
     entry_points={
         "console_scripts": [
             "loc-downloader=loc_downloader.cli:main",
@@ -0,0 +1,20 @@
+import pytest
+from requests_ratelimiter import LimiterSession
+
+from loc_downloader import LocAPI
+
+
+def test_default_construction():
+    api = LocAPI()
+    assert set(api.sessions) == set(LocAPI.RATE_LIMITS)
+    assert set(api.rate_controllers) == set(LocAPI.RATE_LIMITS)
+
+
+@pytest.mark.parametrize("endpoint", sorted(LocAPI.RATE_LIMITS))
+def test_rate_limits_are_valid(endpoint):
+    limits = LocAPI.RATE_LIMITS[endpoint]
+    assert set(limits) == {"per_second", "per_minute", "burst"}
+    assert limits["per_second"] > 0 and limits["burst"] > 0
+    assert limits["per_second"] <= limits["per_minute"]
+    # pyrate-limiter rejects rate lists that do not grow in both count and interval
+    LimiterSession(**limits)
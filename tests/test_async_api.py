@@ -0,0 +1,26 @@
+import asyncio
+
+import httpx
+
+from loc_downloader import AsyncLocAPI
+from loc_downloader.models import ItemResponse
+
+
+def test_same_named_files_get_distinct_paths(tmp_path):
+    urls = [f"https://tile.loc.gov/image-services/iiif/service:gmd:{n}/full/pct:25/0/default.jpg" for n in range(4)]
+    item = ItemResponse(item={"id": "it1", "title": "T"},
+                        resources=[{"url": "https://www.loc.gov/resource/it1/",
+                                    "files": [[{"url": url, "mimetype": "image/jpeg"}] for url in urls]}])
+
+    def handler(request):
+        return httpx.Response(200, content=str(request.url).encode())
+
+    async def download():
+        async with AsyncLocAPI() as api:
+            await api.client.aclose()
+            api.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+            return await api.download_item_files("it1", str(tmp_path), item_response=item)
+
+    paths = asyncio.run(download())
+    assert len(set(paths)) == 4
+    assert sorted(open(path).read() for path in paths) == sorted(urls)
@@ -0,0 +1,92 @@
+import sqlite3
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from loc_downloader import cli
+from loc_downloader.api import LocAPI
+from loc_downloader.models import ItemResponse
+
+
+class OfflineAPI(LocAPI):
+    file_requests = []
+
+    def get_item(self, item_id, attributes=None):
+        files = [[{"url": f"https://tile.loc.gov/{item_id}/default.jpg", "mimetype": "image/jpeg"}]]
+        return ItemResponse(item={"id": item_id, "title": "T"},
+                            resources=[{"url": f"https://www.loc.gov/resource/{item_id}/", "files": files}])
+
+    def _download_file(self, url, output_dir, item_id, expected_size=None, manifest=None):
+        self.file_requests.append(url)
+        filepath = Path(output_dir) / "default.jpg"
+        filepath.write_bytes(b"jpeg")
+        return str(filepath)
+
+
+def test_metadata_then_files_with_same_input(monkeypatch, tmp_path):
+    monkeypatch.setattr(cli, "LocAPI", OfflineAPI)
+    ids = "it1\nit2\nit3\n"
+    runner = CliRunner()
+
+    result = runner.invoke(cli.main, ["metadata", "--input", "-", "-o", str(tmp_path)], input=ids)
+    assert result.exit_code == 0, result.output
+    assert len((tmp_path / "items.jsonl").read_text().splitlines()) == 3
+
+    # Finished metadata must not count as downloaded files
+    result = runner.invoke(cli.main, ["files", "--input", "-", "-o", str(tmp_path)], input=ids)
+    assert result.exit_code == 0, result.output
+    assert len(OfflineAPI.file_requests) == 3
+
+    # A rerun of either command skips everything its own journal recorded
+    result = runner.invoke(cli.main, ["files", "--input", "-", "-o", str(tmp_path)], input=ids)
+    assert result.exit_code == 0, result.output
+    assert len(OfflineAPI.file_requests) == 3
+    result = runner.invoke(cli.main, ["metadata", "--input", "-", "-o", str(tmp_path)], input=ids)
+    assert len((tmp_path / "items.jsonl").read_text().splitlines()) == 3
+
+
+def test_cache_and_index_closed_on_error(monkeypatch, tmp_path):
+    instances = []
+
+    class FailingAPI(OfflineAPI):
+        def get_item(self, item_id, attributes=None):
+            instances.append(self)
+            raise ValueError("no such item")
+
+    monkeypatch.setattr(cli, "LocAPI", FailingAPI)
+    closed = []
+    monkeypatch.setattr(cli.MetadataIndex, "close", lambda self: closed.append(self))
+
+    result = CliRunner().invoke(cli.main, ["metadata", "https://www.loc.gov/item/it1/",
+                                           "--cache", str(tmp_path / "cache.sqlite"),
+                                           "--index", str(tmp_path / "index.sqlite")])
+    assert result.exit_code == 1
+    assert len(closed) == 1
+    with pytest.raises(sqlite3.ProgrammingError):
+        instances[0].cache.get("key")
+
+
+def test_failed_items_are_not_journaled(monkeypatch, tmp_path):
+    failing = {"it1"}
+
+    class FlakyAPI(OfflineAPI):
+        def get_item(self, item_id, attributes=None):
+            if item_id in failing:
+                raise RuntimeError("boom")
+            return super().get_item(item_id, attributes)
+
+    monkeypatch.setattr(cli, "LocAPI", FlakyAPI)
+    ids = "it1\nit2\n"
+    runner = CliRunner()
+
+    result = runner.invoke(cli.main, ["metadata", "--input", "-", "-o", str(tmp_path)], input=ids)
+    assert result.exit_code == 0, result.output
+    assert len((tmp_path / "items.jsonl").read_text().splitlines()) == 1
+
+    # The rerun fetches only the item that failed
+    failing.clear()
+    result = runner.invoke(cli.main, ["metadata", "--input", "-", "-o", str(tmp_path)], input=ids)
+    assert result.exit_code == 0, result.output
+    lines = (tmp_path / "items.jsonl").read_text().splitlines()
+    assert len(lines) == 2 and '"it1"' in lines[1]
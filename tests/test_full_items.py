@@ -0,0 +1,47 @@
+import json
+
+from loc_downloader import LocAPI
+from loc_downloader.models import ItemResponse
+from loc_downloader.sinks import resume_dir_for
+
+
+def make_api(monkeypatch, failing):
+    api = LocAPI(max_workers=2)
+    api.PAGE_SIZE = 2
+
+    def make_request(url, params=None):
+        page = params.get("sp", 1)
+        results = [{"id": f"http://www.loc.gov/item/it{n}/", "title": "T"} for n in range((page - 1) * 2, page * 2)]
+        return {"results": results, "pagination": {"total": 6}}
+
+    def get_item(item_id, attributes=None):
+        if item_id in failing:
+            raise RuntimeError("boom")
+        return ItemResponse(item={"id": item_id, "title": "T"})
+
+    monkeypatch.setattr(api, "_make_request", make_request)
+    monkeypatch.setattr(api, "get_item", get_item)
+    return api
+
+
+def harvest(api, output):
+    api.save_metadata_resumable(api.iter_collection_item_pages("x", resume_dir=resume_dir_for(output)), str(output))
+    return [json.loads(line)["item"]["id"] for line in output.read_text().splitlines()]
+
+
+def test_failed_items_are_fetched_on_resume(monkeypatch, tmp_path):
+    output = tmp_path / "items.jsonl"
+    failing = {"it3"}
+    api = make_api(monkeypatch, failing)
+    assert "it3" not in harvest(api, output)
+    assert (resume_dir_for(output) / "failed_items.txt").read_text() == "it3\n"
+
+    # A retry that is never written is kept for the next run
+    failing.clear()
+    pages = api.iter_collection_item_pages("x", resume_dir=resume_dir_for(output))
+    assert [item.item.id for item in next(pages)[1]] == ["it3"]
+    pages.close()
+
+    ids = harvest(api, output)
+    assert sorted(ids) == [f"it{n}" for n in range(6)]
+    assert sorted(harvest(api, output)) == sorted(ids)
@@ -0,0 +1,18 @@
+from loc_downloader.manifest import DownloadManifest
+
+
+def test_colliding_names_get_distinct_paths(tmp_path):
+    manifest = DownloadManifest(tmp_path)
+    first = manifest.claim("https://tile.loc.gov/a/full/pct:25/0/default.jpg", tmp_path / "default.jpg")
+    second = manifest.claim("https://tile.loc.gov/b/full/pct:25/0/default.jpg", tmp_path / "default.jpg")
+    assert first != second
+
+    first.write_bytes(b"a")
+    second.write_bytes(b"bb")
+    manifest.record("https://tile.loc.gov/a/full/pct:25/0/default.jpg", first, 1)
+    manifest.record("https://tile.loc.gov/b/full/pct:25/0/default.jpg", second, 2)
+
+    # Reruns find both files where they were recorded
+    reloaded = DownloadManifest(tmp_path)
+    assert reloaded.get("https://tile.loc.gov/a/full/pct:25/0/default.jpg")["path"] == first.name
+    assert reloaded.get("https://tile.loc.gov/b/full/pct:25/0/default.jpg")["path"] == second.name
@@ -0,0 +1,52 @@
+import threading
+
+import pytest
+
+from loc_downloader import LocAPI
+from loc_downloader.exceptions import LocAPIError
+from loc_downloader.models import ItemResponse
+
+
+def run_with_timeout(func, timeout=10):
+    outcome = {}
+
+    def target():
+        try:
+            outcome["result"] = func()
+        except Exception as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), "pipeline did not shut down"
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["result"]
+
+
+def items(count):
+    for n in range(count):
+        yield (f"it{n}", ItemResponse(item={"id": f"it{n}", "title": "T"}))
+
+
+def test_manifest_stage_failure_is_raised(monkeypatch, tmp_path):
+    api = LocAPI(max_workers=2)
+
+    def broken(resources, mimetype=None):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(api, "_get_item_files", broken)
+    with pytest.raises(LocAPIError, match="disk full"):
+        run_with_timeout(lambda: api.download_items_files(items(100), str(tmp_path)))
+
+
+def test_producer_failure_is_raised(tmp_path):
+    api = LocAPI(max_workers=2)
+
+    def failing_items():
+        yield from items(3)
+        raise RuntimeError("listing broke")
+
+    with pytest.raises(LocAPIError, match="listing broke"):
+        run_with_timeout(lambda: api.download_items_files(failing_items(), str(tmp_path)))
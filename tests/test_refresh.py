@@ -0,0 +1,80 @@
+import pytest
+
+from loc_downloader import LocAPI
+from loc_downloader.exceptions import LocAPIError
+from loc_downloader.index import MetadataIndex
+from loc_downloader.models import ItemResponse
+
+
+def make_result(n, timestamp):
+    return {"id": f"http://www.loc.gov/item/it{n}/", "title": f"T{n}", "date": "1860", "timestamp": timestamp}
+
+
+def make_api(monkeypatch, results, failing=()):
+    api = LocAPI(max_workers=2)
+    monkeypatch.setattr(api, "iter_collection_pages", lambda *args, **kwargs: iter([(1, list(results))]))
+
+    def get_item(item_id, attributes=None):
+        if item_id in failing:
+            raise RuntimeError("boom")
+        return ItemResponse(item={"id": item_id, "title": "T"})
+
+    monkeypatch.setattr(api, "get_item", get_item)
+    return api
+
+
+def refresh(api, index, limit=None):
+    since = index.get_state("refreshed:x")
+    return [r.item.id for r in api.iter_changed_items("x", index, since=since, limit=limit, state_key="refreshed:x")]
+
+
+def test_limit_keeps_watermark(monkeypatch, tmp_path):
+    index = MetadataIndex(tmp_path / "index.sqlite")
+    index.upsert_results([make_result(n, "2020-01-01T00:00:00Z") for n in range(5)])
+    index.set_state("refreshed:x", "2021-01-01T00:00:00Z")
+
+    api = make_api(monkeypatch, [make_result(n, "2022-01-01T00:00:00Z") for n in range(5)])
+    assert len(refresh(api, index, limit=2)) == 2
+    assert index.get_state("refreshed:x") == "2021-01-01T00:00:00Z"
+
+    # The items left out by the limit are still found by the next refresh
+    assert set(refresh(api, index)) >= {"it2", "it3", "it4"}
+    assert index.get_state("refreshed:x") > "2022"
+
+
+def test_failed_items_keep_watermark(monkeypatch, tmp_path):
+    index = MetadataIndex(tmp_path / "index.sqlite")
+    index.upsert_results([make_result(n, "2020-01-01T00:00:00Z") for n in range(3)])
+    index.set_state("refreshed:x", "2021-01-01T00:00:00Z")
+    results = [make_result(n, "2022-01-01T00:00:00Z") for n in range(3)]
+
+    assert sorted(refresh(make_api(monkeypatch, results, failing={"it1"}), index)) == ["it0", "it2"]
+    assert index.get_state("refreshed:x") == "2021-01-01T00:00:00Z"
+    assert "it1" in refresh(make_api(monkeypatch, results), index)
+
+
+def test_failed_page_keeps_watermark(monkeypatch, tmp_path):
+    index = MetadataIndex(tmp_path / "index.sqlite")
+    index.set_state("refreshed:x", "2021-01-01T00:00:00Z")
+    api = LocAPI(max_workers=2)
+    api.PAGE_SIZE = 2
+    monkeypatch.setattr(api, "get_item",
+                        lambda item_id, attributes=None: ItemResponse(item={"id": item_id, "title": "T"}))
+    failing = {2}
+
+    def make_request(url, params=None):
+        page = params.get("sp", 1)
+        if page in failing:
+            raise LocAPIError("boom")
+        results = [make_result(n, "2022-01-01T00:00:00Z") for n in range((page - 1) * 2, min(page * 2, 6))]
+        return {"results": results, "pagination": {"total": 6}}
+
+    monkeypatch.setattr(api, "_make_request", make_request)
+    with pytest.raises(LocAPIError):
+        refresh(api, index)
+    assert index.get_state("refreshed:x") == "2021-01-01T00:00:00Z"
+
+    # The items of the failed page are found by the next refresh
+    failing.clear()
+    assert {"it2", "it3"} <= set(refresh(api, index))
+    assert index.get_state("refreshed:x") > "2022"